@@ -16,11 +16,101 @@
 # **************************************************************************/
 
 # Demo Flask application
+#
+# `python app.py` runs the Flask development server (debugger and reloader
+# on); `python app.py --serve` runs the stand-in server instead (see `serve`):
+# the reloader and debugger off, no request logging, keep-alive connections,
+# and forked worker processes sharing the listening socket. See the synthetic
+# endpoints below for the responses it can be asked for.
 
-from flask import Flask, jsonify, request
+import argparse
+import asyncio
+import functools
+import gzip
+import io
+import json
+import os
+import random
+import signal
+import socket
+import sys
+import time
+import urllib.parse
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Response, jsonify, request
+from werkzeug.wsgi import get_input_stream
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 app = Flask(__name__)
 
+# responses smaller than this are not compressed
+COMPRESSION_MIN_SIZE = 500
+
+_COMPRESSORS = {
+    "gzip": lambda data: gzip.compress(data, compresslevel=6, mtime=0),
+    "deflate": zlib.compress
+}
+_DECOMPRESSORS = {
+    "gzip": gzip.decompress,
+    "deflate": zlib.decompress
+}
+if brotli is not None:
+    _COMPRESSORS["br"] = brotli.compress
+    _DECOMPRESSORS["br"] = brotli.decompress
+
+
+class DecompressRequestMiddleware(object):
+    """Decodes the compressed request bodies (Content-Encoding) before they reach the application."""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        encoding = environ.get('HTTP_CONTENT_ENCODING', 'identity').lower()
+        if encoding != 'identity':
+            if encoding not in _DECOMPRESSORS:
+                start_response('415 Unsupported Media Type', [('Content-Type', 'text/plain')])
+                return [f"Unsupported Content-Encoding: {encoding}".encode()]
+            body = _DECOMPRESSORS[encoding](get_input_stream(environ).read())
+            # the server's environ keeps the length of the body it received
+            environ = dict(environ)
+            environ['wsgi.input'] = io.BytesIO(body)
+            environ['CONTENT_LENGTH'] = str(len(body))
+            environ.pop('HTTP_CONTENT_ENCODING')
+        return self.wsgi_app(environ, start_response)
+
+
+app.wsgi_app = DecompressRequestMiddleware(app.wsgi_app)
+
+
+def _accepted_encoding(accept_encoding):
+    accepted = [part.split(';')[0].strip().lower() for part in accept_encoding.split(',')]
+    for encoding in ("br", "gzip", "deflate"):
+        if encoding in accepted and encoding in _COMPRESSORS:
+            return encoding
+    return None
+
+
+@app.after_request
+def compress_response(response):
+    response.vary.add('Accept-Encoding')
+    if response.direct_passthrough or response.is_streamed or response.status_code < 200 or \
+            response.status_code in (204, 304) or 'Content-Encoding' in response.headers:
+        return response
+    encoding = _accepted_encoding(request.headers.get('Accept-Encoding', ''))
+    data = response.get_data()
+    if encoding is None or len(data) < COMPRESSION_MIN_SIZE:
+        return response
+    response.set_data(_COMPRESSORS[encoding](data))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
 
 @app.route('/v1/simple-get', methods=['GET'])
 def simple_get():
@@ -40,5 +130,281 @@ def get_with_params():
     return jsonify({"data": {"param1": param1, "param2": param2}}), 200
 
 
+@app.route('/v1/items/<item_id>', methods=['PUT', 'PATCH', 'DELETE'])
+def item(item_id):
+    if request.method == 'DELETE':
+        return '', 204
+    return jsonify({"id": item_id, "method": request.method, "data": request.get_json()}), 200
+
+
+@app.route('/v1/upload', methods=['POST'])
+def upload():
+    size = 0
+    for chunk in iter(lambda: request.stream.read(65536), b''):
+        size += len(chunk)
+    return jsonify({"data": {"bytes": size, "chunked": request.headers.get('Transfer-Encoding') == 'chunked'}}), 201
+
+
+@app.route('/v1/items', methods=['GET'])
+def items():
+    count = request.args.get('count', 100, type=int)
+    return jsonify({"data": [{"id": i, "name": f"item-{i}", "tags": ["a", "b"]} for i in range(count)]}), 200
+
+
+@app.route('/v1/token', methods=['POST'])
+def token():
+    return jsonify({"token": uuid.uuid4().hex, "expires_in": 3600}), 201
+
+
+# Synthetic endpoints, to measure the test harness against a server that is
+# not its bottleneck. Every /v1/synthetic/ request can be delayed and failed:
+#   - latency (ms), plus or minus a random jitter (ms),
+#   - error_rate: the probability of an error_status (default 503) response.
+# The query parameters default to the SYNTHETIC_LATENCY_MS, SYNTHETIC_JITTER_MS
+# and SYNTHETIC_ERROR_RATE environment variables.
+SYNTHETIC_LATENCY_MS = float(os.getenv('SYNTHETIC_LATENCY_MS', '0'))
+SYNTHETIC_JITTER_MS = float(os.getenv('SYNTHETIC_JITTER_MS', '0'))
+SYNTHETIC_ERROR_RATE = float(os.getenv('SYNTHETIC_ERROR_RATE', '0'))
+# the largest generated document, in items (or nodes, for nested documents)
+SYNTHETIC_MAX_ITEMS = 1000000
+# the deepest nested document (two levels of nesting per depth: the standard
+# library json decodes up to ~1000 levels)
+SYNTHETIC_MAX_DEPTH = 400
+
+
+@app.before_request
+def synthetic_latency_and_errors():
+    if not request.path.startswith('/v1/synthetic/'):
+        return None
+    latency = request.args.get('latency', SYNTHETIC_LATENCY_MS, type=float)
+    jitter = request.args.get('jitter', SYNTHETIC_JITTER_MS, type=float)
+    delay = max(latency + random.uniform(-jitter, jitter), 0.0)
+    if delay:
+        time.sleep(delay / 1000.0)
+    if random.random() < request.args.get('error_rate', SYNTHETIC_ERROR_RATE, type=float):
+        return jsonify({"error": "Injected error"}), request.args.get('error_status', 503, type=int)
+    return None
+
+
+def _synthetic_item(index):
+    return {
+        "id": index, "name": f"item-{index}", "tags": ["a", "b"], "score": index % 1000 / 10, "active": index % 2 == 0
+    }
+
+
+def _encode(document):
+    return json.dumps(document, separators=(',', ':')).encode('utf-8')
+
+
+def _synthetic_tree(depth, width):
+    # encoded bottom-up, the nodes of a level being all the same: no recursion (json.dumps fails past ~450 levels)
+    node = _encode({"value": "leaf"})
+    for level in range(1, depth + 1):
+        node = b'{"depth":%d,"children":[%s]}' % (level, b','.join([node] * width))
+    return node
+
+
+@functools.lru_cache(maxsize=32)
+def _synthetic_document(items, size, depth, width, encoding):
+    # generated (and compressed) once per process: the server time is not spent building the same bodies
+    if depth:
+        data = b'{"depth":%d,"width":%d,"data":%s}' % (depth, width, _synthetic_tree(depth, width))
+    else:
+        if size is not None:
+            # as many items as needed to reach the size
+            items, total = 0, 0
+            while total < size and items < SYNTHETIC_MAX_ITEMS:
+                total += len(_encode(_synthetic_item(items))) + 1
+                items += 1
+        data = _encode({"items": items, "data": [_synthetic_item(index) for index in range(items)]})
+    if encoding is None or len(data) < COMPRESSION_MIN_SIZE:
+        return data, None
+    return _COMPRESSORS[encoding](data), encoding
+
+
+def _synthetic_error(message):
+    return jsonify({"error": message}), 400
+
+
+@app.route('/v1/synthetic/json', methods=['GET'])
+def synthetic_json():
+    """A generated document: `items` items, about `size` bytes, or a tree of the given `depth` and `width`."""
+    depth = request.args.get('depth', 0, type=int)
+    width = request.args.get('width', 1, type=int)
+    size = request.args.get('size', type=int)
+    items = request.args.get('items', 100, type=int)
+    nodes = items
+    if 0 < depth <= SYNTHETIC_MAX_DEPTH and width > 0:
+        nodes = sum(width ** level for level in range(depth + 1))
+    if depth < 0 or width < 1 or depth > SYNTHETIC_MAX_DEPTH or not 0 <= nodes <= SYNTHETIC_MAX_ITEMS:
+        return _synthetic_error(f"At most {SYNTHETIC_MAX_ITEMS} items, and a depth of {SYNTHETIC_MAX_DEPTH}")
+    data, encoding = _synthetic_document(
+        items, size, depth, width, _accepted_encoding(request.headers.get('Accept-Encoding', ''))
+    )
+    response = Response(data, mimetype='application/json')
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+@app.route('/v1/synthetic/stream', methods=['GET'])
+def synthetic_stream():
+    """`items` generated items, sent in chunks of `chunk` items every `interval` ms (chunked transfer encoding)."""
+    items = request.args.get('items', 1000, type=int)
+    chunk = request.args.get('chunk', 100, type=int)
+    interval = request.args.get('interval', 0, type=float)
+    if not 0 <= items <= SYNTHETIC_MAX_ITEMS or chunk < 1:
+        return _synthetic_error(f"At most {SYNTHETIC_MAX_ITEMS} items, in chunks of at least 1")
+
+    def generate():
+        yield f'{{"items":{items},"data":['.encode('utf-8')
+        for start in range(0, items, chunk):
+            if start and interval:
+                time.sleep(interval / 1000.0)
+            encoded = b','.join(_encode(_synthetic_item(index)) for index in range(start, min(start + chunk, items)))
+            yield (b',' if start else b'') + encoded
+        yield b']}'
+
+    return Response(generate(), mimetype='application/json')
+
+
+def _wsgi_environ(web_request, body, host, port, multiprocess):
+    # an aiohttp request as a WSGI environ (the body already read, as sent: decoded by the app)
+    path, _, query_string = web_request.raw_path.partition('?')
+    environ = {
+        'REQUEST_METHOD': web_request.method,
+        'SCRIPT_NAME': '',
+        'PATH_INFO': urllib.parse.unquote(path, encoding='latin-1'),
+        'QUERY_STRING': query_string,
+        'SERVER_NAME': host,
+        'SERVER_PORT': str(port),
+        'SERVER_PROTOCOL': f"HTTP/{web_request.version.major}.{web_request.version.minor}",
+        'REMOTE_ADDR': web_request.remote or '',
+        'CONTENT_TYPE': web_request.headers.get('Content-Type', ''),
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.input_terminated': True,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': multiprocess,
+        'wsgi.run_once': False
+    }
+    for name in web_request.headers.keys():
+        key = 'HTTP_' + name.upper().replace('-', '_')
+        if key not in ('HTTP_CONTENT_TYPE', 'HTTP_CONTENT_LENGTH') and key not in environ:
+            environ[key] = ','.join(web_request.headers.getall(name))
+    return environ
+
+
+def _call_wsgi(environ):
+    # runs the app (in a worker thread): the status, headers and whole body, or an iterator of the body (streamed)
+    started, written, sent = [], [], []
+
+    def start_response(status, headers, exc_info=None):
+        if exc_info is not None:
+            try:
+                if sent:
+                    # too late to send an error response instead
+                    raise exc_info[1].with_traceback(exc_info[2])
+            finally:
+                exc_info = None
+        elif started:
+            raise AssertionError("start_response called twice without exc_info")
+        started[:] = [status, headers]
+        return written.append
+
+    result = app(environ, start_response)
+    status, headers = started
+    if any(name.lower() == 'content-length' for name, _ in headers):
+        try:
+            return status, headers, b''.join(written) + b''.join(result), None
+        finally:
+            getattr(result, 'close', lambda: None)()
+    # the headers are sent once returned: the body written (before any iteration) comes first
+    sent.append(True)
+    return status, headers, b''.join(written), result
+
+
+def serve(host, port, workers, threads):
+    """
+    Serves the app from `workers` processes forked after binding the socket,
+    each running an aiohttp server (with keep-alive connections, unlike the
+    development server) and the app in a pool of `threads` threads.
+    """
+    from aiohttp import web
+
+    async def handle(web_request):
+        body = await web_request.read()
+        loop = asyncio.get_running_loop()
+        status, headers, data, iterable = await loop.run_in_executor(
+            None, _call_wsgi, _wsgi_environ(web_request, body, host, port, workers > 1)
+        )
+        code, _, reason = status.partition(' ')
+        response = web.StreamResponse(status=int(code), reason=reason or None)
+        for name, value in headers:
+            response.headers.add(name, value)
+        await response.prepare(web_request)
+        if data:
+            await response.write(data)
+        if iterable is not None:
+            iterator = iter(iterable)
+            try:
+                while True:
+                    chunk = await loop.run_in_executor(None, next, iterator, None)
+                    if chunk is None:
+                        break
+                    if chunk:
+                        await response.write(chunk)
+            finally:
+                getattr(iterable, 'close', lambda: None)()
+        await response.write_eof()
+        return response
+
+    async def run(listening_socket):
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=threads))
+        runner = web.ServerRunner(web.Server(handle, auto_decompress=False), access_log=None, handle_signals=True)
+        await runner.setup()
+        await web.SockSite(runner, listening_socket).start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+
+    listening_socket = socket.create_server((host, port), backlog=1024)
+    children = []
+    for _ in range(workers - 1):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                asyncio.run(run(listening_socket))
+            except (KeyboardInterrupt, web.GracefulExit):
+                pass
+            finally:
+                os._exit(0)
+        children.append(pid)
+    print(f" * Serving the stand-in server on http://{host}:{port} ({workers} workers)", flush=True)
+    try:
+        asyncio.run(run(listening_socket))
+    except (KeyboardInterrupt, web.GracefulExit):
+        pass
+    finally:
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+        for pid in children:
+            os.waitpid(pid, 0)
+
+
 if __name__ == '__main__':
-    app.run(debug=True)
+    parser = argparse.ArgumentParser(description="Demo API (Flask development server, or --serve)")
+    parser.add_argument("--serve", action="store_true", help="run the multi-worker stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (--serve)")
+    parser.add_argument("--threads", type=int, default=32, help="threads running the app, per worker (--serve)")
+    arguments = parser.parse_args()
+    if arguments.serve:
+        serve(arguments.host, arguments.port, max(arguments.workers, 1), max(arguments.threads, 1))
+    else:
+        app.run(host=arguments.host, port=arguments.port, debug=True)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+"""
+Benchmark of `DotKeyDictParser.parse` with and without cached parse plans.
+
+Usage:
+    python -m tests.benchmarks.dot_key_dict_parser
+"""
+
+import timeit
+from typing import Callable, Dict
+from tests.utils.dot_key_dict_parser import DotKeyDictParser, _compile
+
+
+def wide_table(width=250):
+    # type: (int) -> Dict[str, str]
+    """A table of `width` keys, spread over lists of objects of 10 fields."""
+    return {f"items[{i // 10}].field{i % 10}": f"int({i})" for i in range(width)}
+
+
+def deep_table(depth=12, width=20):
+    # type: (int, int) -> Dict[str, str]
+    """A table of `width` keys, `depth` levels deep (with a list every third level)."""
+    path = ".".join(f"level{i}[0]" if i % 3 == 2 else f"level{i}" for i in range(depth - 1))
+    return {f"{path}.field{i}": f"value{i}" for i in range(width)}
+
+
+def _best(function, number):
+    # type: (Callable, int) -> float
+    return min(timeit.repeat(function, number=number, repeat=5)) / number
+
+
+def main(number=200):
+    # type: (int) -> None
+    parser = DotKeyDictParser()
+
+    def uncached(data):
+        _compile.cache_clear()
+        return parser.parse(data)
+
+    print(f"{'table':<24} {'keys':>6} {'uncached µs':>12} {'cached µs':>10} {'speedup':>8}")
+    for name, data in (("wide (250 keys)", wide_table()), ("deep (12 levels)", deep_table())):
+        assert uncached(data) == parser.parse(data)
+        cold = _best(lambda: uncached(data), number)
+        warm = _best(lambda: parser.parse(data), number)
+        print(f"{name:<24} {len(data):>6} {cold * 1e6:>12.1f} {warm * 1e6:>10.1f} {cold / warm:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
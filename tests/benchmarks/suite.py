@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+"""
+Benchmark suite of the table-to-payload and comparison hot paths, with a
+regression check against stored baseline results.
+
+Every benchmark runs a function on synthetic tables or responses of
+increasing width, depth or list size. It is measured in several rounds
+(the best of several repeats each), every round relative to a calibration
+loop (pure Python) measured right before it: a slower period of the machine
+slows both, and a baseline recorded on another machine can still be
+compared. The median of the rounds is kept, along with the noise of the
+benchmark (the largest deviation of a round from the median). A benchmark
+regresses when it is slower than the baseline by more than the threshold,
+or by more than its noise (in the baseline and in the current run) if it
+is noisier; it is measured again before being reported.
+
+Usage:
+    python -m tests.benchmarks.suite                 # compare against the baseline
+    python -m tests.benchmarks.suite --save          # record the baseline
+    python -m tests.benchmarks.suite --filter parse  # only the matching benchmarks
+
+Configuration (environment variables):
+    - BENCHMARK_BASELINE: the baseline file (default tests/benchmarks/baseline.json).
+    - BENCHMARK_THRESHOLD: the slowdown reported as a regression, as a
+      fraction of the baseline time (default 0.25), unless the benchmark
+      is noisier.
+
+The exit status is 1 if any benchmark regressed.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import timeit
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+from behave.model import Table
+from tests.benchmarks.dot_key_dict_parser import deep_table, wide_table
+from tests.utils import calls, gherkin, validators
+from tests.utils.dot_key_dict_parser import DotKeyDictParser
+
+
+BASELINE_FILE = os.getenv("BENCHMARK_BASELINE", os.path.join(os.path.dirname(__file__), "baseline.json"))
+THRESHOLD = float(os.getenv("BENCHMARK_THRESHOLD", "0.25"))
+
+# the time of one repeat, the number of repeats (the best one is kept), and
+# the number of rounds (the median one is kept)
+_REPEAT_TIME = 0.02
+_REPEATS = 5
+_ROUNDS = 5
+# the number of times a regressed benchmark is measured again (_ROUNDS more rounds), to rule out noise
+_CONFIRM_RUNS = 2
+
+
+def list_table(size):
+    # type: (int) -> Dict[str, str]
+    """A table of a list of `size` objects of 3 fields."""
+    table = {}
+    for i in range(size):
+        table.update({
+            f"items[{i}].id": f"int({i})",
+            f"items[{i}].name": f"item-{i}",
+            f"items[{i}].tags": "[\"a\", \"b\"]"
+        })
+    return table
+
+
+def _gherkin_table(data):
+    # type: (Dict[str, str]) -> Table
+    return Table(["param", "value"], rows=[[key, value] for key, value in data.items()])
+
+
+def _response(width, depth, size):
+    # type: (int, int, int) -> Dict[str, Any]
+    """A response of `width` fields per object, nested `depth` levels, with a list of `size` objects."""
+    node = {f"field{i}": f"value{i}" for i in range(width)}
+    node["items"] = [{"id": i, "name": f"item-{i}", "active": i % 2 == 0} for i in range(size)]
+    for level in range(depth):
+        node = {f"level{level}": node, "id": level}
+    return node
+
+
+def _benchmarks():
+    # type: () -> Iterator[Tuple[str, Callable[[], Any]]]
+    parser = DotKeyDictParser()
+    for width in (10, 100, 1000):
+        data = wide_table(width)
+        yield f"parser.parse[width={width}]", lambda data=data: parser.parse(data)
+    for depth in (4, 16, 64):
+        data = deep_table(depth=depth)
+        yield f"parser.parse[depth={depth}]", lambda data=data: parser.parse(data)
+    for size in (10, 100, 1000):
+        data = list_table(size)
+        yield f"parser.parse[list={size}]", lambda data=data: parser.parse(data)
+
+    context = SimpleNamespace(user={"id": 7, "name": "user-7", "roles": ["admin", "dev"]})
+    for width in (10, 100, 1000):
+        table = _gherkin_table(wide_table(width))
+        yield f"gherkin.parse_table_to_body[width={width}]", \
+            lambda table=table: gherkin.parse_table_to_body(context, table)
+        table = _gherkin_table({f"field{i}": "<ctx.user.name>-<ctx.user.roles.0>" for i in range(width)})
+        yield f"gherkin.parse_table_to_body[context,width={width}]", \
+            lambda table=table: gherkin.parse_table_to_body(context, table, with_context_attributes=True)
+    for size in (10, 100, 1000):
+        table = _gherkin_table(list_table(size))
+        yield f"gherkin.dot_key_table_to_body_json[list={size}]", \
+            lambda table=table: gherkin.dot_key_table_to_body_json(context, table)
+
+    for size in (0, 10, 100):
+        query_params = {f"param{i}": f"value {i}" for i in range(size)}
+        yield f"calls._build_url[params={size}]", \
+            lambda query_params=query_params: calls._build_url(
+                "http://localhost:5000/", "v1", "/simple-get/", query_params
+            )
+
+    for name, width, depth, size in (
+        ("width=10", 10, 1, 0), ("width=1000", 1000, 1, 0),
+        ("depth=16", 10, 16, 0), ("depth=64", 10, 64, 0),
+        ("list=100", 10, 1, 100), ("list=10000", 10, 1, 10000)
+    ):
+        actual = _response(width, depth, size)
+        expected = json.loads(json.dumps(actual))
+        yield f"validators.partial_dict_compare[{name}]", \
+            lambda expected=expected, actual=actual: validators.partial_dict_compare(expected, actual)
+    actual = _response(10, 1, 1000)
+    expected = json.loads(json.dumps(actual))
+    expected["level0"]["items"].reverse()
+    yield "validators.partial_dict_compare[unordered,list=1000]", \
+        lambda: validators.partial_dict_compare(expected, actual, unordered_lists=True)
+
+
+def _calibration():
+    # type: () -> int
+    total = 0
+    for i in range(10000):
+        total += i % 7
+    return total
+
+
+def measure(function):
+    # type: (Callable[[], Any]) -> float
+    """Returns the best time of one call of the function, in seconds."""
+    single = timeit.timeit(function, number=1)
+    number = max(1, int(_REPEAT_TIME / max(single, 1e-9)))
+    return min(timeit.repeat(function, number=number, repeat=_REPEATS)) / number
+
+
+def _measure_rounds(benchmarks, samples, calibrations):
+    # type: (List[Tuple[str, Callable[[], Any]]], Dict[str, List[float]], List[float]) -> None
+    # adds _ROUNDS rounds of the benchmarks: their times relative to the calibration measured right before
+    for _ in range(_ROUNDS):
+        for name, function in benchmarks:
+            calibration = measure(_calibration)
+            calibrations.append(calibration * 1e6)
+            samples.setdefault(name, []).append(measure(function) / calibration)
+
+
+def _summary(samples, calibrations):
+    # type: (Dict[str, List[float]], List[float]) -> Dict[str, Any]
+    calibration = statistics.median(calibrations)
+    results, noise = {}, {}  # type: Dict[str, float], Dict[str, float]
+    for name, ratios in samples.items():
+        median = statistics.median(ratios)
+        results[name] = median * calibration
+        noise[name] = max(abs(ratio - median) for ratio in ratios) / median
+    return {
+        "calibration": calibration, "results": results, "noise": noise,
+        "samples": samples, "calibrations": calibrations
+    }
+
+
+def run(pattern=None):
+    # type: (str | None) -> Dict[str, Any]
+    """
+    Runs the benchmarks (matching the pattern), returning the calibration
+    time and the median benchmark times, in µs, and the noise of every
+    benchmark (a fraction of its time).
+    """
+    benchmarks = [(name, function) for name, function in _benchmarks() if not pattern or pattern in name]
+    samples, calibrations = {}, []  # type: Dict[str, List[float]], List[float]
+    _measure_rounds(benchmarks, samples, calibrations)
+    return _summary(samples, calibrations)
+
+
+def compare(current, baseline, threshold=THRESHOLD):
+    # type: (Dict[str, Any], Dict[str, Any], float) -> List[Tuple[str, float, float | None, float | None, float]]
+    """
+    Returns (name, time, baseline time, change, allowed change) for every
+    benchmark, the times scaled to the baseline machine. The allowed change
+    is the threshold, or the noise of the benchmark if larger.
+    """
+    scale = baseline["calibration"] / current["calibration"] if baseline else 1.0
+    rows = []
+    for name, value in current["results"].items():
+        scaled = value * scale
+        reference = baseline.get("results", {}).get(name) if baseline else None
+        change = scaled / reference - 1 if reference else None
+        noise = current["noise"].get(name, 0.0) + (baseline.get("noise", {}).get(name, 0.0) if baseline else 0.0)
+        rows.append((name, scaled, reference, change, max(threshold, noise)))
+    return rows
+
+
+def confirm(current, baseline, threshold=THRESHOLD):
+    # type: (Dict[str, Any], Dict[str, Any], float) -> Dict[str, Any]
+    """
+    Measures the regressed benchmarks in more rounds (the median of all
+    their rounds kept), until they are not regressed anymore.
+    """
+    functions = dict(_benchmarks())
+    for _ in range(_CONFIRM_RUNS):
+        regressed = [
+            name for name, _, _, change, allowed in compare(current, baseline, threshold)
+            if change is not None and change > allowed
+        ]
+        if not regressed:
+            break
+        _measure_rounds([(name, functions[name]) for name in regressed], current["samples"], current["calibrations"])
+        current = _summary(current["samples"], current["calibrations"])
+    return current
+
+
+def main(argv=None):
+    # type: (List[str] | None) -> int
+    arguments = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    arguments.add_argument("--save", action="store_true", help="record the results as the baseline")
+    arguments.add_argument("--filter", help="only run the benchmarks whose name contains this text")
+    arguments.add_argument("--threshold", type=float, default=THRESHOLD, help="regression threshold (fraction)")
+    options = arguments.parse_args(argv)
+
+    current = run(options.filter)
+    baseline = {}  # type: Dict[str, Any]
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as baseline_file:
+            baseline = json.load(baseline_file)
+    if baseline and not options.save:
+        current = confirm(current, baseline, options.threshold)
+
+    regressions = 0
+    print(f"{'benchmark':<56} {'µs':>10} {'baseline':>10} {'change':>8} {'allowed':>8}")
+    for name, value, reference, change, allowed in compare(current, baseline, options.threshold):
+        regressed = change is not None and change > allowed
+        regressions += regressed
+        print(
+            f"{name:<56} {value:>10.2f} "
+            f"{f'{reference:.2f}' if reference is not None else '-':>10} "
+            f"{f'{change:+.0%}' if change is not None else '-':>8} "
+            f"{f'{allowed:+.0%}':>8}"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+
+    if options.save:
+        if options.filter and baseline:
+            # a partial run only updates its own benchmarks (scaled to the calibration of the baseline)
+            scale = baseline["calibration"] / current["calibration"]
+            baseline["results"].update((name, value * scale) for name, value in current["results"].items())
+            baseline.setdefault("noise", {}).update(current["noise"])
+            current = baseline
+        current = {
+            "calibration": round(current["calibration"], 3),
+            "results": {name: round(value, 3) for name, value in sorted(current["results"].items())},
+            "noise": {name: round(value, 3) for name, value in sorted(current["noise"].items())}
+        }
+        with open(BASELINE_FILE, "w") as baseline_file:
+            json.dump(current, baseline_file, indent=2)
+            baseline_file.write("\n")
+        print(f"Baseline saved to {BASELINE_FILE}")
+        return 0
+    if regressions:
+        print(f"{regressions} benchmark(s) regressed by more than their allowed change")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -16,9 +16,76 @@
 # **************************************************************************/
 
 from behave import Step
+from behave.model import Feature, Scenario
 from behave.runner import Context
+from tests.utils import cassette, fixtures, policy, timing, transport
+from tests.utils.logger import logger
+
+
+def before_all(context):
+    # type: (Context) -> None
+    # open the pooled HTTP transport shared by every scenario of this worker
+    transport.setup()
+    cassette.setup()
+    # identify the run (unless FIXTURE_RUN_ID is set), and remove the fixtures of the previous runs
+    fixtures.start_run()
+
+
+def after_all(context):
+    # type: (Context) -> None
+    # report connection reuse and close the pooled HTTP transport
+    stats = transport.stats()
+    logger.info(
+        "HTTP connections: %d new, %d reused (%d requests)",
+        stats['new_connections'], stats['reused_connections'], stats['requests']
+    )
+    transport.teardown()
+    cassette.teardown()
+    # report the retries of the request policy
+    policy_stats = policy.stats()
+    if policy_stats['retries'] or policy_stats['rejected']:
+        logger.info(
+            "HTTP retries: %d (%.2fs waiting), %d requests rejected by an open circuit",
+            policy_stats['retries'], policy_stats['retry_wait'], policy_stats['rejected']
+        )
+    # write the recorded timings and summarize the slowest steps
+    if timing.enabled():
+        timing.flush()
+        logger.info("Slowest steps:\n%s", timing.slowest_steps_table())
+
+
+def before_feature(context, feature):
+    # type: (Context, Feature) -> None
+    timing.set_current(feature=feature.name, scenario=None, step=None)
+
+
+def after_feature(context, feature):
+    # type: (Context, Feature) -> None
+    timing.set_current(scenario=None, step=None)
+    timing.record("feature", feature.name, feature.duration, status=feature.status.name)
+    timing.flush()
+
+
+def before_scenario(context, scenario):
+    # type: (Context, Scenario) -> None
+    timing.set_current(scenario=scenario.name, step=None)
+    # timeouts and retries of the scenario's requests, from the feature and scenario tags
+    context.request_policy = policy.from_tags(scenario.effective_tags)
+
+
+def after_scenario(context, scenario):
+    # type: (Context, Scenario) -> None
+    timing.set_current(step=None)
+    timing.record("scenario", scenario.name, scenario.duration, status=scenario.status.name)
+
 
 def before_step(context, step):
     # type: (Context, Step) -> None
     # set the step attribute in the context
     context.step = step
+    timing.set_current(step=step.name)
+
+
+def after_step(context, step):
+    # type: (Context, Step) -> None
+    timing.record("step", f"{step.keyword} {step.name}", step.duration, status=step.status.name)
@@ -0,0 +1,52 @@
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+
+Feature: Compressed requests and responses
+  # Enter feature description here
+
+  Background:
+    Given a REST API at "http://localhost:5000"
+    And with an API version "v1"
+
+  Scenario: GET compressed items (200 OK)
+    Given a REST API resource at "/items"
+    And with the following query parameters
+      | param | value |
+      | count | 1000  |
+    And with compressed responses
+    When a "GET" request is made
+    Then the expected response status code is "200"
+    And the response is compressed with "gzip"
+    And the response size on the wire is below "8000" bytes
+
+  Scenario: GET uncompressed items (200 OK)
+    Given a REST API resource at "/items"
+    And with the response encodings "identity"
+    When a "GET" request is made
+    Then the expected response status code is "200"
+    And the response is compressed with "identity"
+
+  Scenario: POST compressed upload from a file (201 Created)
+    Given a REST API resource at "/upload"
+    And with the request body from file "tests/data/items.json"
+    And with the request body compressed with "gzip"
+    When a "POST" request is made
+    Then the expected response status code is "201"
+    And the response body contains the following data table
+      | param        | value      |
+      | data.bytes   | int(67780) |
+      | data.chunked | bool(true) |
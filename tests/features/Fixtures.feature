@@ -0,0 +1,56 @@
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+Feature: Fixtures
+  # Enter feature description here
+
+  Background:
+    Given a REST API at "http://localhost:5000"
+    And with an API version "v1"
+    And the "feature" fixture "session" from a "POST" request to "/token" with tags "auth"
+
+  Scenario: POST simple-post with a cached token (201 Created)
+    Given a REST API resource at "/simple-post"
+    And with the following request body with context attributes
+      | param | value                |
+      | token | <ctx.session.token>  |
+    When a "POST" request is made
+    Then the expected response status code is "201"
+    And the response body contains the following data table with context attributes
+      | param      | value               |
+      | data.token | <ctx.session.token> |
+
+  Scenario: GET simple-get with run fixtures (200 OK)
+    Given the "run" fixture "greeting" from a "GET" request to "/simple-get" for "60" seconds
+    And a REST API resource at "/simple-get"
+    When a "GET" request is made
+    Then the expected response status code is "200"
+    And the response body contains the following data table with context attributes
+      | param   | value                  |
+      | message | <ctx.greeting.message> |
+
+  Scenario: Invalidated fixtures are fetched again (201 Created)
+    Given the fixtures tagged "auth" are invalidated
+    And the "feature" fixture "token" from a "POST" request to "/token" for "60" seconds with tags "auth"
+    And a REST API resource at "/simple-post"
+    And with the following request body with context attributes
+      | param | value             |
+      | token | <ctx.token.token> |
+    When a "POST" request is made
+    Then the expected response status code is "201"
+    And the response body contains the following data table with context attributes
+      | param      | value             |
+      | data.token | <ctx.token.token> |
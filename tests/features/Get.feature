@@ -33,6 +33,26 @@ Feature: GET
       }
       """
 
+  @GET @stream
+  Scenario: GET simple-get (200 OK, streamed response)
+    Given a REST API resource at "/simple-get"
+    When a "GET" request is made with a streamed response
+    Then the expected response status code is "200"
+    And the response body is
+      """
+      {
+        "message": "GET request successful"
+      }
+      """
+
+  @GET @latency
+  Scenario: GET simple-get (response time)
+    Given a REST API resource at "/simple-get"
+    When a "GET" request is made
+    Then the expected response status code is "200"
+    And the response time is below "1000" ms
+    And the p95 response time over "20" requests is below "1000" ms
+
   @GET
   Scenario Outline: GET get_with_params (200 OK)
     Given a REST API resource at "get_with_params"
@@ -51,3 +71,30 @@ Feature: GET
       | param1 | param2   |
       | 7      | 8        |
       | ABC    | XYZ      |
+
+  @GET
+  Scenario: GET get_with_params (200 OK, schema)
+    Given a REST API resource at "get_with_params"
+    And with the following query parameters
+      | key    | value |
+      | param1 | 7     |
+    When a "GET" request is made
+    Then the expected response status code is "200"
+    And the response body matches the following schema
+      | param       | value     |
+      | data.param1 | str       |
+      | data.param2 | str\|null |
+      | data.extra  | int?      |
+
+  @GET
+  Scenario: GET get_with_params (200 OK, bulk requests)
+    Given a REST API resource at "get_with_params"
+    When the following "GET" requests are made concurrently
+      | param1 | param2 |
+      | 7      | 8      |
+      | ABC    | XYZ    |
+    Then all the response status codes are "200"
+    And the responses are "exactly" compared against the following data table
+      | data.param1 | data.param2 |
+      | str(7)      | str(8)      |
+      | ABC         | XYZ         |
@@ -0,0 +1,68 @@
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+Feature: PUT, PATCH, DELETE and streamed uploads
+  # Enter feature description here
+
+  Background:
+    Given a REST API at "http://localhost:5000"
+    And with an API version "v1"
+
+  Scenario Outline: <method> item (200 OK)
+    Given a REST API resource at "/items/42"
+    And with the following request body
+      | param | value |
+      | key1  | val1  |
+    When a "<method>" request is made
+    Then the expected response status code is "200"
+    And the response body contains the following data table
+      | param     | value    |
+      | id        | 42       |
+      | method    | <method> |
+      | data.key1 | val1     |
+
+    Examples:
+      | method |
+      | PUT    |
+      | PATCH  |
+
+  Scenario: DELETE item (204 No Content)
+    Given a REST API resource at "/items/42"
+    When a "DELETE" request is made
+    Then the expected response status code is "204"
+
+  Scenario: POST upload from a file (201 Created)
+    Given a REST API resource at "/upload"
+    And with the request body from file "tests/data/items.json"
+    When a "POST" request is made
+    Then the expected response status code is "201"
+    And the response body contains the following data table
+      | param        | value     |
+      | data.bytes   | int(67780) |
+      | data.chunked | bool(true) |
+
+  Scenario: POST generated upload (201 Created)
+    Given a REST API resource at "/upload"
+    And with a generated request body of "10000" items like the following data table
+      | param | value         |
+      | id    | <index>       |
+      | name  | item-<index>  |
+    When a "POST" request is made
+    Then the expected response status code is "201"
+    And the response body contains the following data table
+      | param        | value       |
+      | data.bytes   | int(337781) |
+      | data.chunked | bool(true)  |
@@ -34,6 +34,20 @@ Feature: POST
       | data.key1   | val1  |
       | data.key2   | val2  |
 
+  Scenario: POST simple-post (201 Created, schema)
+    Given a REST API resource at "/simple-post"
+    And with the following request body
+      | param | value  |
+      | key1  | int(7) |
+      | key2  | val2   |
+    When a "POST" request is made
+    Then the expected response status code is "201"
+    And the response body matches schema "simple-post.json"
+    And the response body matches the following schema
+      | param     | value    |
+      | data.key1 | str\|int |
+      | data.key2 | str      |
+
   Scenario Outline: POST simple-post (201 Created)
     Given a REST API resource at "/simple-post"
     And with the following request body
@@ -55,6 +69,30 @@ Feature: POST
       | val7 | val8   |
       | ABC  | XYZ    |
 
+  Scenario: POST simple-post (201 Created, streamed response)
+    Given a REST API resource at "/simple-post"
+    And with the following request body
+      | param | value     |
+      | key1  | val1      |
+      | items | [1, 2, 3] |
+    When a "POST" request is made with a streamed response
+    Then the expected response status code is "201"
+    And the response body is "partially" compared against the following data table
+      | param      | value     |
+      | data.items | [1, 2, 3] |
+
+  Scenario: POST simple-post (201 Created, unordered list)
+    Given a REST API resource at "/simple-post"
+    And with the following request body
+      | param | value     |
+      | name  | ABC       |
+      | items | [3, 1, 2] |
+    When a "POST" request is made
+    Then the expected response status code is "201"
+    And the response body is "partially unordered" compared against the following data table
+      | param      | value     |
+      | data.items | [1, 2, 3] |
+
   Scenario: POST simple-post (201 OK)
     Given a REST API resource at "/simple-post"
     And saved attributes to context
@@ -70,3 +108,35 @@ Feature: POST
       | param        | value      |
       | data.key1 | <ctx.name> |
       | data.key2 | val2       |
+
+  Scenario: POST simple-post (201 OK, nested and interpolated context attributes)
+    Given a REST API resource at "/simple-post"
+    And saved attributes to context
+      | param     | value |
+      | user.name | ABC   |
+      | user.id   | 7     |
+    And with the following request body with context attributes
+      | param | value                          |
+      | key1  | <ctx.user.name>                |
+      | key2  | <ctx.user.name>-<ctx.user.id> |
+    When a "POST" request is made
+    Then the expected response status code is "201"
+    And the response body contains the following data table with context attributes
+      | param     | value           |
+      | data.key1 | <ctx.user.name> |
+      | data.key2 | ABC-7           |
+
+  Scenario: POST simple-post (201 Created, bulk requests)
+    Given a REST API resource at "/simple-post"
+    When the following "POST" requests are made concurrently
+      | key1 | key2       | items     |
+      | val1 | val2       | [1, 2]    |
+      | ABC  | XYZ        | []        |
+      | 7    | str(8)     | [3]       |
+    Then all the response status codes are "201"
+    And all the responses match schema "simple-post.json"
+    And the responses are "partially" compared against the following data table
+      | data.key1 | data.key2 | data.items |
+      | val1      | val2      | [1, 2]     |
+      | ABC       | XYZ       | []         |
+      | 7         | str(8)    | [3]        |
@@ -0,0 +1,96 @@
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+
+Feature: Synthetic endpoints
+  # Enter feature description here
+
+  Background:
+    Given a REST API at "http://localhost:5000"
+    And with an API version "v1"
+
+  Scenario: GET a generated document (200 OK)
+    Given a REST API resource at "/synthetic/json"
+    And with the following query parameters
+      | param | value |
+      | items | 5000  |
+    When a "GET" request is made
+    Then the expected response status code is "200"
+    And the response body is "partially" compared against the following data table
+      | param | value     |
+      | items | int(5000) |
+
+  Scenario: GET a deeply nested document (200 OK)
+    Given a REST API resource at "/synthetic/json"
+    And with the following query parameters
+      | param | value |
+      | depth | 200   |
+    When a "GET" request is made
+    Then the expected response status code is "200"
+    And the response body is "partially" compared against the following data table
+      | param | value    |
+      | depth | int(200) |
+
+  Scenario: GET a document nested at the maximum depth (200 OK)
+    Given a REST API resource at "/synthetic/json"
+    And with the following query parameters
+      | param | value |
+      | depth | 400   |
+    When a "GET" request is made
+    Then the expected response status code is "200"
+    And the response body is "partially" compared against the following data table
+      | param | value    |
+      | depth | int(400) |
+
+  Scenario: GET a document nested past the maximum depth (400 Bad Request)
+    Given a REST API resource at "/synthetic/json"
+    And with the following query parameters
+      | param | value |
+      | depth | 401   |
+    When a "GET" request is made
+    Then the expected response status code is "400"
+
+  Scenario: GET a generated document in chunks (200 OK, streamed response)
+    Given a REST API resource at "/synthetic/stream"
+    And with the following query parameters
+      | param    | value |
+      | items    | 10000 |
+      | chunk    | 500   |
+      | interval | 1     |
+    When a "GET" request is made with a streamed response
+    Then the expected response status code is "200"
+    And the response body is "partially" compared against the following data table
+      | param | value      |
+      | items | int(10000) |
+
+  Scenario: GET with latency (response time)
+    Given a REST API resource at "/synthetic/json"
+    And with the following query parameters
+      | param   | value |
+      | latency | 50    |
+      | jitter  | 10    |
+    When a "GET" request is made
+    Then the expected response status code is "200"
+    And the response time is below "1000" ms
+
+  Scenario: GET with an injected error (500 Internal Server Error)
+    Given a REST API resource at "/synthetic/json"
+    And with the following query parameters
+      | param        | value |
+      | error_rate   | 1     |
+      | error_status | 500   |
+    When a "GET" request is made
+    Then the expected response status code is "500"
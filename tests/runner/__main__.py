@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+"""
+Alternative execution engines for the acceptance tests.
+
+Usage:
+    python -m tests.runner tests/features --async --concurrency 200
+    python -m tests.runner tests/features --load --duration 60 --rps 500 --concurrency 50
+    python -m tests.runner tests/features --parallel --processes 4
+    python -m tests.runner tests/features --batch --concurrency 20
+    python -m tests.runner tests/features --parallel --changed
+"""
+
+import argparse
+import os
+import sys
+from typing import Dict, List
+from tests.utils import fixtures, logger, timing
+from . import impact
+from .scenarios import ScenarioResult, load_scenarios, load_steps, match_steps
+
+
+def _parse_args(argv=None):
+    # type: (List[str]) -> argparse.Namespace
+    parser = argparse.ArgumentParser(prog="python -m tests.runner", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="*", default=["tests/features"], help="feature files or directories")
+    parser.add_argument("--tags", action="append", help="only run scenarios matching the tag expression")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--async", dest="async_mode", action="store_true",
+                      help="run the scenarios concurrently on one asyncio event loop")
+    mode.add_argument("--load", action="store_true",
+                      help="replay the scenarios repeatedly as a throughput/latency workload")
+    mode.add_argument("--batch", action="store_true",
+                      help="run the examples of every Scenario Outline together, sending their requests concurrently")
+    mode.add_argument("--parallel", action="store_true",
+                      help="run the scenarios over worker processes, balanced by their past durations")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="maximum number of requests in flight (default: 100, or 10 with --load and --batch)")
+    parser.add_argument("--duration", type=float, default=30.0,
+                        help="duration of the load run, in seconds (default: 30)")
+    parser.add_argument("--rps", type=float, default=None,
+                        help="target rate of scenario runs per second (default: as fast as possible)")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="number of worker processes of --parallel (default: the number of CPUs)")
+    parser.add_argument("--changed", action="store_true",
+                        help="only run the scenarios affected by a change since the last run, reusing the other results")
+    parser.add_argument("--changed-endpoint", action="append", default=[], metavar="'METHOD /PATH'",
+                        help="an endpoint whose scenarios are run again with --changed (e.g. 'POST /simple-post')")
+    return parser.parse_args(argv)
+
+
+def _report(results):
+    # type: (List[ScenarioResult]) -> int
+    failed = [result for result in results if not result.passed]
+    for result in failed:
+        print(f"FAILED {result.scenario.location} {result.scenario.name}")
+        print(f"    {result.step.keyword} {result.step.name}")
+        print(f"    {type(result.error).__name__}: {result.error}")
+    reused = sum(result.reused for result in results)
+    print(f"{len(results) - len(failed)} scenarios passed{f' ({reused} reused)' if reused else ''}, {len(failed)} failed")
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    # type: (List[str]) -> int
+    args = _parse_args(argv)
+    # the run-scoped fixtures are shared by the workers of this run only (see `fixtures`)
+    os.environ.setdefault("FIXTURE_RUN_ID", f"runner-{os.getpid()}")
+    fixtures.start_run()
+    load_steps()
+    scenarios = load_scenarios(args.paths, tags=args.tags)
+    match_steps(scenarios)
+    if args.load:
+        from . import load
+        all_stats = load.run(scenarios, args.duration, concurrency=args.concurrency or 10, rps=args.rps)
+        print(load.format_report(all_stats, args.duration))
+        timing.flush()
+        return 0
+    records = impact.load()
+    selected = list(range(len(scenarios)))
+    reused = {}  # type: Dict[int, ScenarioResult]
+    if args.changed:
+        selected, reused, reasons = impact.select(scenarios, records, args.changed_endpoint)
+        for index in selected:
+            print(f"RUN {scenarios[index].location} {scenarios[index].name} ({reasons[index]})")
+    results = []  # type: List[ScenarioResult]
+    if not selected:
+        pass
+    elif args.async_mode:
+        from . import async_engine
+        results = async_engine.run([scenarios[index] for index in selected], concurrency=args.concurrency or 100)
+    elif args.batch:
+        from . import batch
+        results = batch.run([scenarios[index] for index in selected], concurrency=args.concurrency or 10)
+    elif args.parallel:
+        from . import parallel
+        results = parallel.run(scenarios, args.paths, tags=args.tags, processes=args.processes, only=selected)
+        if os.getenv("LOG_JSON_DIR"):
+            logger.flush()
+            print(f"Merged the worker logs into {logger.merge_json_logs()}")
+    impact.save(records, results)
+    results = dict(zip(selected, results))
+    results.update(reused)
+    timing.flush()
+    return _report([results[index] for index in sorted(results)])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
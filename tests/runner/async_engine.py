@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+"""
+asyncio execution engine.
+
+Runs many scenarios on one event loop. Every scenario still runs its steps in
+order, but the request of `When a "{method}" request is made` is deferred by
+`calls.make` and awaited here over a shared `aiohttp.ClientSession` (with the
+scenario's request policy), so up to `concurrency` scenarios have a request in
+flight at the same time. The steps themselves run in the loop's default
+executor, so the steps sending their requests synchronously (e.g. the bulk,
+fixture and percentile steps) do not block the other scenarios.
+"""
+
+import asyncio
+import time
+from typing import Any, List
+from behave.model import Scenario
+from tests.utils import calls
+from .scenarios import ScenarioResult, new_context, run_step
+
+
+__all__ = 'run'
+
+
+async def _run_scenario(session, semaphore, scenario):
+    # type: (Any, asyncio.Semaphore, Scenario) -> ScenarioResult
+    context = new_context(scenario, defer_requests=True, pending_call=None)
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    for step in scenario.all_steps:
+        try:
+            await loop.run_in_executor(None, run_step, context, step)
+            if context.pending_call is not None:
+                call, context.pending_call = context.pending_call, None
+                async with semaphore:
+                    context.response = await calls.make_async(context, session, call)
+        except Exception as error:
+            return ScenarioResult(scenario, "failed", step, error, time.perf_counter() - start, context.endpoints)
+    return ScenarioResult(scenario, "passed", duration=time.perf_counter() - start, endpoints=context.endpoints)
+
+
+async def _run(scenarios, concurrency):
+    # type: (List[Scenario], int) -> List[ScenarioResult]
+    import aiohttp
+
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        return await asyncio.gather(*(
+            _run_scenario(session, semaphore, scenario) for scenario in scenarios
+        ))
+
+
+def run(scenarios, concurrency=100):
+    # type: (List[Scenario], int) -> List[ScenarioResult]
+    """Runs the scenarios concurrently, with at most `concurrency` requests in flight."""
+    return asyncio.run(_run(scenarios, concurrency))
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+"""
+Scenario Outline batch engine.
+
+Runs all the examples of a Scenario Outline together, in lockstep: the
+Background runs once for the whole outline, then every step runs for all
+the example rows before the next one. The requests made by a step (one per
+row) are sent concurrently over the pooled transport, and the following
+steps validate all the responses. A row failing a step leaves the batch, and
+is reported as a failure of its own scenario.
+
+Plain scenarios run as batches of one.
+"""
+
+import copy
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from behave.model import Scenario, ScenarioOutline, Step
+from tests.utils import calls, transport
+from .scenarios import ScenarioContext, ScenarioResult, new_context, run_step
+
+
+__all__ = 'run'
+
+
+class _Row(object):
+    """One example row (scenario) of a batch, with its own context."""
+    __slots__ = ['index', 'scenario', 'steps', 'context', 'step', 'error', 'duration']
+
+    def __init__(self, index, scenario, context):
+        # type: (int, Scenario, ScenarioContext) -> None
+        self.index = index
+        self.scenario = scenario
+        self.steps = scenario.steps  # type: List[Step]
+        self.context = context
+        self.step = None  # type: Step | None
+        self.error = None  # type: BaseException | None
+        self.duration = 0.0
+
+    def fail(self, step, error, start):
+        # type: (Step, BaseException, float) -> None
+        self.step, self.error, self.duration = step, error, time.perf_counter() - start
+
+
+def _batches(scenarios):
+    # type: (List[Scenario]) -> List[List[Tuple[int, Scenario]]]
+    # the scenarios generated by an outline are grouped (by outline), in their order of appearance
+    outlines = {}  # type: Dict[int, ScenarioOutline]
+    for feature in {id(scenario.feature): scenario.feature for scenario in scenarios}.values():
+        for outline in feature.scenarios:
+            if isinstance(outline, ScenarioOutline):
+                outlines.update((id(generated), outline) for generated in outline.scenarios)
+    batches = {}  # type: Dict[int, List[Tuple[int, Scenario]]]
+    for index, scenario in enumerate(scenarios):
+        key = id(outlines.get(id(scenario), scenario))
+        batches.setdefault(key, []).append((index, scenario))
+    return list(batches.values())
+
+
+def _send_all(executor, rows, start):
+    # type: (Executor, List[_Row], float) -> None
+    futures = [(row, executor.submit(calls.send, row.context, row.context.pending_call)) for row in rows]
+    for row, future in futures:
+        row.context.pending_call = None
+        try:
+            row.context.response = future.result()
+        except Exception as error:
+            row.fail(row.step, error, start)
+
+
+def _run_batch(executor, batch):
+    # type: (Executor, List[Tuple[int, Scenario]]) -> List[_Row]
+    start = time.perf_counter()
+    # the Background steps are the same for every row: run them once
+    shared = new_context(batch[0][1], defer_requests=True, pending_call=None)
+    for step in batch[0][1].background_steps:
+        try:
+            run_step(shared, step)
+            if shared.pending_call is not None:
+                call, shared.pending_call = shared.pending_call, None
+                shared.response = calls.send(shared, call)
+        except Exception as error:
+            rows = [_Row(index, scenario, shared) for index, scenario in batch]
+            for row in rows:
+                row.fail(step, error, start)
+            return rows
+    rows = [_Row(index, scenario, copy.copy(shared)) for index, scenario in batch]
+    for row in rows:
+        row.context.endpoints = set(shared.endpoints)
+    for position in range(max(len(row.steps) for row in rows)):
+        running = [row for row in rows if row.error is None and position < len(row.steps)]
+        for row in running:
+            row.step = row.steps[position]
+            try:
+                run_step(row.context, row.step)
+            except Exception as error:
+                row.fail(row.step, error, start)
+        _send_all(executor, [row for row in running if row.error is None and row.context.pending_call is not None], start)
+    for row in rows:
+        if row.error is None:
+            row.duration = time.perf_counter() - start
+    return rows
+
+
+def run(scenarios, concurrency=10):
+    # type: (List[Scenario], int) -> List[ScenarioResult]
+    """Runs the scenarios, batching the examples of each outline, with at most `concurrency` requests in flight."""
+    results = [None] * len(scenarios)  # type: List[ScenarioResult | None]
+    transport.setup(pool_maxsize=concurrency)
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for batch in _batches(scenarios):
+                for row in _run_batch(executor, batch):
+                    status = "passed" if row.error is None else "failed"
+                    results[row.index] = ScenarioResult(
+                        row.scenario, status, row.step if row.error is not None else None, row.error, row.duration,
+                        row.context.endpoints
+                    )
+    finally:
+        transport.teardown()
+    return results
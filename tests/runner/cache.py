@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+"""
+On-disk cache of the parsed feature files and of the step matches.
+
+    - every feature file is parsed once (outlines expanded) and pickled,
+      along with its mtime, size and content hash: it is reused as long as
+      the mtime and size are unchanged, or else the content hash is.
+    - the step definition matching every step text (and the parsed step
+      arguments) is kept in one file, valid as long as the step modules are
+      unchanged, so the step patterns are not matched again.
+
+Configuration (environment variables):
+    - FEATURE_CACHE: 'off' to disable the cache (default 'on').
+    - FEATURE_CACHE_DIR: the cache directory (default '.feature_cache').
+"""
+
+import copyreg
+import hashlib
+import os
+import pickle
+import sys
+from typing import Dict, Iterable, List, Tuple
+import behave
+from behave.matchers import Match
+from behave.model import Feature, Step, Tag
+from behave.model_core import Argument
+from behave.parser import parse_file
+from behave.step_registry import registry
+
+
+__all__ = [
+    'CACHE_DIR',
+    'enabled',
+    'load_feature',
+    'find_match',
+    'load_matches',
+    'save_matches'
+]
+
+
+CACHE_DIR = os.getenv("FEATURE_CACHE_DIR", ".feature_cache")
+_enabled = os.getenv("FEATURE_CACHE", "on").lower() != "off"
+# a cache written by another behave (or pickle) version is ignored
+_VERSION = f"{behave.__version__}-{pickle.HIGHEST_PROTOCOL}"
+
+# Tag is a str with a line number, created by Tag(name, line): pickled the same way
+copyreg.pickle(Tag, lambda tag: (Tag, (str(tag), tag.line)))
+
+# (step type, step text) -> (step definition location, arguments)
+_matches = {}  # type: Dict[Tuple[str, str], Tuple[str, List[Argument]]]
+_matches_changed = False
+# step definition location -> step definition, of the loaded step modules
+_definitions = {}  # type: Dict[str, object]
+
+
+def enabled():
+    # type: () -> bool
+    return _enabled
+
+
+def _read(path):
+    # type: (str) -> dict | None
+    try:
+        with open(path, "rb") as cache_file:
+            entry = pickle.load(cache_file)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, TypeError):
+        return None
+    return entry if entry.get("version") == _VERSION else None
+
+
+def _write(path, entry):
+    # type: (str, dict) -> None
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    entry["version"] = _VERSION
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as cache_file:
+        pickle.dump(entry, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_path, path)
+
+
+def load_feature(filename):
+    # type: (str) -> Feature | None
+    """Returns the parsed feature file, from the cache if it is unchanged."""
+    if not _enabled:
+        return parse_file(filename)
+    path = os.path.join(CACHE_DIR, hashlib.sha1(os.path.abspath(filename).encode("utf-8")).hexdigest() + ".pickle")
+    stat = os.stat(filename)
+    entry = _read(path)
+    if entry is not None and (entry["mtime_ns"], entry["size"]) == (stat.st_mtime_ns, stat.st_size):
+        return entry["feature"]
+    with open(filename, "rb") as feature_file:
+        content_hash = hashlib.sha256(feature_file.read()).hexdigest()
+    if entry is None or entry["hash"] != content_hash:
+        feature = parse_file(filename)
+        if feature is not None:
+            # expands (and so caches) the scenario outlines
+            list(feature.walk_scenarios())
+        entry = {"hash": content_hash, "feature": feature}
+    entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+    _write(path, entry)
+    return entry["feature"]
+
+
+def _steps_hash(modules):
+    # type: (Iterable[str]) -> str
+    digest = hashlib.sha256()
+    for module in modules:
+        with open(sys.modules[module].__file__, "rb") as module_file:
+            digest.update(module_file.read())
+    return digest.hexdigest()
+
+
+def load_matches(modules):
+    # type: (Iterable[str]) -> None
+    """Loads the cached step matches, if the (imported) step modules are unchanged."""
+    global _matches_changed
+    _matches.clear()
+    _matches_changed = False
+    _definitions.clear()
+    _definitions.update(
+        (str(definition.location), definition)
+        for definitions in registry.steps.values() for definition in definitions
+    )
+    if not _enabled:
+        return
+    entry = _read(os.path.join(CACHE_DIR, "matches.pickle"))
+    if entry is not None and entry["steps_hash"] == _steps_hash(modules):
+        _matches.update(entry["matches"])
+
+
+def save_matches(modules):
+    # type: (Iterable[str]) -> None
+    """Writes the step matches found since they were loaded."""
+    global _matches_changed
+    if _enabled and _matches_changed:
+        _write(os.path.join(CACHE_DIR, "matches.pickle"), {"steps_hash": _steps_hash(modules), "matches": _matches})
+        _matches_changed = False
+
+
+def find_match(step):
+    # type: (Step) -> Match | None
+    """Returns the match of a step against the step registry, reusing the cached matches."""
+    global _matches_changed
+    key = (step.step_type, step.name)
+    cached = _matches.get(key)
+    if cached is not None:
+        definition = _definitions.get(cached[0])
+        if definition is not None:
+            return Match(definition.func, cached[1])
+    match = registry.find_match(step)
+    if match is not None:
+        _matches[key] = (str(match.location), match.arguments)
+        _matches_changed = True
+    return match
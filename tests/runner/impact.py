@@ -0,0 +1,325 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+"""
+Impact analysis: selects the scenarios affected by a change since the last
+run, and reuses the results of the others.
+
+Every run records, for every scenario:
+    - a hash of its text (tags, steps, tables and texts, background included),
+    - the functions it depends on: the step implementations it matched, and
+      the functions and classes of `tests.steps` and `tests.utils` they use
+      (transitively, found in their source), each with a hash of its code,
+    - the endpoints (method and resource path) it requested,
+    - its status and duration.
+
+A scenario is affected if it is new, did not pass, or if its text, the code
+of one of its functions (or of the module level code around them) or one of
+its endpoints changed. Code is compared by syntax tree, so comments and
+formatting do not count as changes.
+
+What a function uses is found by name, which misses the methods called on
+instances (e.g. `context.request_policy.send`) and the values of constants:
+so a function using a module depends on its module level code (constants
+included, and the functions and classes it uses) and on all its classes.
+
+Configuration (environment variables):
+    - IMPACT_FILE: the file of the recorded runs (default '.scenario_impact.json').
+"""
+
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+from typing import Dict, Iterable, List, Set, Tuple
+from behave.model import Scenario, Step
+from . import cache
+from .parallel import scenario_id
+from .scenarios import ScenarioResult
+
+
+__all__ = [
+    'IMPACT_FILE',
+    'load',
+    'save',
+    'select'
+]
+
+
+IMPACT_FILE = os.getenv("IMPACT_FILE", ".scenario_impact.json")
+# the packages whose code is analyzed
+_PACKAGES = ("tests.steps", "tests.utils")
+# the key of the module level code (everything but the functions and classes) of a module
+_MODULE_CODE = "<module>"
+
+
+def _is_analyzed(module):
+    # type: (str) -> bool
+    return any(module == package or module.startswith(package + ".") for package in _PACKAGES)
+
+
+def _module_exists(module):
+    # type: (str) -> bool
+    try:
+        return importlib.util.find_spec(module) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def _hash(node):
+    # type: (ast.AST | List[ast.AST]) -> str
+    dump = "\n".join(ast.dump(item) for item in node) if isinstance(node, list) else ast.dump(node)
+    return hashlib.sha1(dump.encode("utf-8")).hexdigest()
+
+
+def _imports(package, tree):
+    # type: (str, ast.Module) -> Tuple[Dict[str, str], Dict[str, Tuple[str, str]]]
+    # the analyzed modules imported by the module (alias -> module), and the names imported from them
+    modules = {}  # type: Dict[str, str]
+    names = {}  # type: Dict[str, Tuple[str, str]]
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if _is_analyzed(alias.name):
+                    modules[alias.asname or alias.name] = alias.name
+        elif isinstance(node, ast.ImportFrom):
+            source = importlib.util.resolve_name("." * node.level + (node.module or ""), package) \
+                if node.level else node.module
+            if not _is_analyzed(source) and not any(package.startswith(source + ".") for package in _PACKAGES):
+                continue
+            for alias in node.names:
+                submodule = f"{source}.{alias.name}"
+                if _is_analyzed(submodule) and _module_exists(submodule):
+                    modules[alias.asname or alias.name] = submodule
+                elif _is_analyzed(source):
+                    names[alias.asname or alias.name] = (source, alias.name)
+    return modules, names
+
+
+def _definition_key(node, duplicated):
+    # type: (ast.AST, bool) -> str
+    # the step implementations share their name: they are told apart by their first decorator (the step pattern)
+    if duplicated and node.decorator_list:
+        return f"{node.name}[{ast.unparse(node.decorator_list[0])}]"
+    return node.name
+
+
+class _Module(object):
+    """The functions and classes of a module, with their code hashes, references and line ranges."""
+
+    def __init__(self, module):
+        # type: (str) -> None
+        spec = importlib.util.find_spec(module)
+        with open(spec.origin, encoding="utf-8") as source_file:
+            tree = ast.parse(source_file.read(), spec.origin)
+        package = module if spec.submodule_search_locations else module.rpartition(".")[0]
+        modules, names = _imports(package, tree)
+        definitions = [
+            node for node in tree.body if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+        ]
+        counts = {}  # type: Dict[str, int]
+        for node in definitions:
+            counts[node.name] = counts.get(node.name, 0) + 1
+        module_code = [node for node in tree.body if node not in definitions]
+        self.module = module
+        self.hashes = {_MODULE_CODE: _hash(module_code)}
+        self.references = {}  # type: Dict[str, Set[Tuple[str, str]]]
+        self.lines = []  # type: List[Tuple[int, int, str]]
+        self.classes = [node.name for node in definitions if isinstance(node, ast.ClassDef) and counts[node.name] == 1]
+        local = {node.name: _definition_key(node, counts[node.name] > 1) for node in definitions}
+        self.references[_MODULE_CODE] = set().union(
+            *(self._references(node, local, modules, names) for node in module_code)
+        )
+        for node in definitions:
+            key = _definition_key(node, counts[node.name] > 1)
+            self.hashes[key] = _hash(node)
+            self.references[key] = self._references(node, local, modules, names)
+            first_line = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+            self.lines.append((first_line, node.end_lineno, key))
+
+    def _references(self, node, local, modules, names):
+        # type: (ast.AST, Dict[str, str], Dict[str, str], Dict[str, Tuple[str, str]]) -> Set[Tuple[str, str]]
+        references = {(self.module, _MODULE_CODE)}
+        for child in ast.walk(node):
+            if isinstance(child, ast.Name):
+                if child.id in local and child.id != getattr(node, "name", None):
+                    references.add((self.module, local[child.id]))
+                elif child.id in names:
+                    references.add(names[child.id])
+            elif isinstance(child, ast.Attribute) and isinstance(child.value, ast.Name) and child.value.id in modules:
+                references.add((modules[child.value.id], child.attr))
+        return references
+
+    def key_at(self, line):
+        # type: (int) -> str | None
+        for first_line, last_line, key in self.lines:
+            if first_line <= line <= last_line:
+                return key
+        return None
+
+
+class _Analysis(object):
+    """The code hashes and the dependencies of the analyzed modules, parsed on demand."""
+
+    def __init__(self):
+        # type: () -> None
+        self.modules = {}  # type: Dict[str, _Module | None]
+        self.closures = {}  # type: Dict[str, Set[str]]
+
+    def module(self, name):
+        # type: (str) -> _Module | None
+        if name not in self.modules:
+            self.modules[name] = _Module(name) if _is_analyzed(name) and _module_exists(name) else None
+        return self.modules[name]
+
+    def code_hash(self, key):
+        # type: (str) -> str | None
+        module_name, _, name = key.partition(":")
+        module = self.module(module_name)
+        return module.hashes.get(name) if module is not None else None
+
+    def dependencies(self, key):
+        # type: (str) -> Set[str]
+        """The key of a function (module:name), with the keys of every function it uses, transitively."""
+        if key in self.closures:
+            return self.closures[key]
+        closure = set()  # type: Set[str]
+        pending = [key]
+        while pending:
+            current = pending.pop()
+            if current in closure:
+                continue
+            closure.add(current)
+            module_name, _, name = current.partition(":")
+            module = self.module(module_name)
+            if module is None:
+                continue
+            # the module level code and the classes of a module used (their methods may be called on instances)
+            pending.append(f"{module_name}:{_MODULE_CODE}")
+            pending.extend(f"{module_name}:{class_name}" for class_name in module.classes)
+            for reference_module, reference in module.references.get(name, ()):
+                referenced = self.module(reference_module)
+                if referenced is None:
+                    continue
+                # a constant (or a name re-exported by a package) is part of the module level code
+                pending.append(f"{reference_module}:{reference if reference in referenced.hashes else _MODULE_CODE}")
+        self.closures[key] = closure
+        return closure
+
+    def step_key(self, step):
+        # type: (Step) -> str | None
+        match = cache.find_match(step)
+        if match is None:
+            return None
+        module = self.module(match.func.__module__)
+        name = module.key_at(match.func.__code__.co_firstlineno) if module is not None else None
+        return f"{module.module}:{name}" if name is not None else None
+
+
+def _text_hash(scenario):
+    # type: (Scenario) -> str
+    text = [sorted(str(tag) for tag in scenario.effective_tags), scenario.name]
+    for step in scenario.all_steps:
+        text.append([step.keyword, step.name, step.text])
+        if step.table is not None:
+            text.append([step.table.headings] + [row.cells for row in step.table.rows])
+    return hashlib.sha1(json.dumps(text).encode("utf-8")).hexdigest()
+
+
+def load(path=IMPACT_FILE):
+    # type: (str) -> Dict[str, dict]
+    """Returns the records of the previously run scenarios."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as impact_file:
+            return json.load(impact_file)
+    except ValueError:
+        return {}
+
+
+def save(records, results, path=IMPACT_FILE):
+    # type: (Dict[str, dict], Iterable[ScenarioResult], str) -> None
+    """Records the given results (of the scenarios run, not reused) into the file."""
+    analysis = _Analysis()
+    for result in results:
+        keys = set()  # type: Set[str]
+        for step in result.scenario.all_steps:
+            key = analysis.step_key(step)
+            if key is not None:
+                keys |= analysis.dependencies(key)
+        records[scenario_id(result.scenario)] = {
+            "text": _text_hash(result.scenario),
+            "code": {key: analysis.code_hash(key) for key in sorted(keys)},
+            "endpoints": sorted(result.endpoints),
+            "status": result.status,
+            "duration": result.duration
+        }
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as impact_file:
+        json.dump(records, impact_file, indent=1, sort_keys=True)
+    os.replace(temporary_path, path)
+
+
+def _reason(record, scenario, analysis, changed_endpoints):
+    # type: (dict | None, Scenario, _Analysis, Set[str]) -> str | None
+    if record is None:
+        return "new"
+    if record["status"] != "passed":
+        return record["status"]
+    if record["text"] != _text_hash(scenario):
+        return "feature text changed"
+    for key, code_hash in record["code"].items():
+        if analysis.code_hash(key) != code_hash:
+            return f"{key} changed"
+    endpoints = changed_endpoints.intersection(record["endpoints"])
+    if endpoints:
+        return f"endpoint {min(endpoints)} changed"
+    return None
+
+
+def select(scenarios, records, changed_endpoints=()):
+    # type: (List[Scenario], Dict[str, dict], Iterable[str]) -> Tuple[List[int], Dict[int, ScenarioResult], Dict[int, str]]
+    """
+    Returns the indexes of the scenarios affected by a change since their
+    recorded run (with the reason they are), and the recorded results of
+    the others. The changed endpoints are given as "METHOD /resource-path".
+    """
+    analysis = _Analysis()
+    changed_endpoints = {_endpoint(endpoint) for endpoint in changed_endpoints}
+    selected = []  # type: List[int]
+    reused = {}  # type: Dict[int, ScenarioResult]
+    reasons = {}  # type: Dict[int, str]
+    for index, scenario in enumerate(scenarios):
+        record = records.get(scenario_id(scenario))
+        reason = _reason(record, scenario, analysis, changed_endpoints)
+        if reason is None:
+            reused[index] = ScenarioResult(
+                scenario, "passed", duration=record["duration"], endpoints=record["endpoints"], reused=True
+            )
+        else:
+            selected.append(index)
+            reasons[index] = reason
+    return selected, reused, reasons
+
+
+def _endpoint(endpoint):
+    # type: (str) -> str
+    # as recorded by `calls.prepare`: "METHOD /resource-path"
+    method, _, path = endpoint.strip().partition(" ")
+    return f"{method.upper()} /{path.strip().strip('/')}"
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+"""
+Load-test mode.
+
+Replays the acceptance scenarios as a throughput/latency workload: worker
+threads run the selected scenarios round-robin (steps, tables and assertions
+included) over the pooled transport for a fixed duration, optionally paced to
+a target rate. Every request a scenario sends (see `calls.send`: its request
+steps, but also the bulk, fixture and percentile steps) is timed, and the
+results are aggregated per scenario.
+"""
+
+import itertools
+import threading
+import time
+from collections import Counter
+from typing import List
+from behave.model import Scenario
+from tests.utils import calls, timing, transport
+from .scenarios import new_context, run_step
+
+
+__all__ = [
+    'ScenarioStats',
+    'run',
+    'format_report'
+]
+
+
+class ScenarioStats(object):
+    """Latency samples, status codes and error count of one scenario under load."""
+
+    def __init__(self, scenario):
+        # type: (Scenario) -> None
+        self.scenario = scenario
+        self.runs = 0
+        self.errors = 0
+        self.latencies = []  # type: List[float]
+        self.status_codes = Counter()
+        self._lock = threading.Lock()
+
+    def record_request(self, latency, status):
+        # type: (float, int | str) -> None
+        with self._lock:
+            self.latencies.append(latency)
+            self.status_codes[status] += 1
+
+    def record_run(self, failed):
+        # type: (bool) -> None
+        with self._lock:
+            self.runs += 1
+            self.errors += failed
+
+    @property
+    def error_rate(self):
+        # type: () -> float
+        return self.errors / self.runs if self.runs else 0.0
+
+    def percentile(self, percent):
+        # type: (float) -> float
+        """Nearest-rank percentile of the request latencies, in seconds."""
+        return timing.percentile(sorted(self.latencies), percent)
+
+
+class _Pacer(object):
+    """Hands out evenly spaced start times to the workers, to hold a target rate."""
+
+    def __init__(self, rps=None):
+        # type: (float) -> None
+        self._interval = 1.0 / rps if rps else 0.0
+        self._next = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        # type: () -> None
+        if not self._interval:
+            return
+        with self._lock:
+            slot = max(self._next, time.perf_counter())
+            self._next = slot + self._interval
+        delay = slot - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _run_once(stats):
+    # type: (ScenarioStats) -> None
+    context = new_context(stats.scenario, record_request=stats.record_request)
+    failed = False
+    for step in stats.scenario.all_steps:
+        try:
+            run_step(context, step)
+        except Exception:
+            failed = True
+            break
+    stats.record_run(failed)
+
+
+def run(scenarios, duration, concurrency=10, rps=None):
+    # type: (List[Scenario], float, int, float) -> List[ScenarioStats]
+    """
+    Drives the scenarios for `duration` seconds with `concurrency` workers.
+
+    If `rps` is given, scenario runs are started at that rate (as long as
+    enough workers are free); otherwise every worker starts its next run as
+    soon as the previous one finished.
+    """
+    all_stats = [ScenarioStats(scenario) for scenario in scenarios]
+    if not all_stats:
+        return all_stats
+    pacer = _Pacer(rps)
+    counter = itertools.count()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        while True:
+            pacer.wait()
+            if time.perf_counter() >= deadline:
+                return
+            _run_once(all_stats[next(counter) % len(all_stats)])
+
+    # every worker may send as many requests at once as the bulk steps do (see `calls.make_all`)
+    previous_settings = transport.settings()
+    transport.setup(pool_maxsize=concurrency * max(calls.BULK_CONCURRENCY, 1))
+    try:
+        workers = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+    finally:
+        transport.setup(**previous_settings)
+    return all_stats
+
+
+def format_report(all_stats, duration):
+    # type: (List[ScenarioStats], float) -> str
+    """Formats the per-scenario throughput, error rate, latency percentiles and status codes."""
+    header = f"{'scenario':<50} {'runs':>7} {'req/s':>8} {'errors':>7} " \
+             f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  status codes"
+    lines = [header, "-" * len(header)]
+    for stats in all_stats:
+        status_codes = ", ".join(f"{status}: {count}" for status, count in sorted(stats.status_codes.items(), key=str))
+        lines.append(
+            f"{stats.scenario.name[:50]:<50} {stats.runs:>7} {len(stats.latencies) / duration:>8.1f} "
+            f"{stats.error_rate:>6.1%} {stats.percentile(50) * 1000:>8.1f} "
+            f"{stats.percentile(95) * 1000:>8.1f} {stats.percentile(99) * 1000:>8.1f}  {status_codes}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+"""
+Duration-aware parallel execution engine.
+
+Runs the scenarios in worker processes. The duration of every scenario is kept
+in a history file across runs, and used to plan the run:
+    - the scenarios are spread over the workers longest first, each going to
+      the least loaded worker (LPT bin packing), then
+    - every worker runs its own queue longest first and, once it is empty,
+      steals the shortest scenario left in the queue of the most loaded worker.
+The planned queues make the common case balanced, and stealing absorbs the
+estimation errors (scenarios without history are estimated at the mean).
+
+A scenario is the unit of scheduling, so its Background steps always run
+with it, in the same worker.
+"""
+
+import heapq
+import json
+import multiprocessing
+import os
+import pickle
+import queue
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+from behave.model import Scenario
+from tests.utils import logger, timing, transport
+from .scenarios import ScenarioResult, load_scenarios, load_steps, run_scenario
+
+
+__all__ = [
+    'HISTORY_FILE',
+    'scenario_id',
+    'load_history',
+    'save_history',
+    'plan',
+    'run'
+]
+
+
+HISTORY_FILE = os.getenv("SCENARIO_HISTORY_FILE", ".scenario_durations.json")
+# weight of the latest duration in the smoothed history
+_SMOOTHING = 0.5
+_DEFAULT_ESTIMATE = 1.0
+
+
+def scenario_id(scenario):
+    # type: (Scenario) -> str
+    """Identifies a scenario in the history (by file and name, so it survives line shifts)."""
+    return f"{scenario.location.filename}::{scenario.name}"
+
+
+def load_history(path=HISTORY_FILE):
+    # type: (str) -> Dict[str, float]
+    """Returns the smoothed duration (in seconds) of the previously run scenarios."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as history_file:
+        return json.load(history_file)
+
+
+def save_history(history, results, path=HISTORY_FILE):
+    # type: (Dict[str, float], List[ScenarioResult], str) -> None
+    """Folds the durations of the given results into the history file."""
+    for result in results:
+        key = scenario_id(result.scenario)
+        previous = history.get(key)
+        history[key] = result.duration if previous is None else \
+            _SMOOTHING * result.duration + (1 - _SMOOTHING) * previous
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as history_file:
+        json.dump(history, history_file, indent=1, sort_keys=True)
+    os.replace(temporary_path, path)
+
+
+def plan(scenarios, history, workers):
+    # type: (List[Scenario], Dict[str, float], int) -> Tuple[List[Deque[int]], List[float]]
+    """
+    Spreads the scenarios (by index) over `workers` queues, longest first onto
+    the least loaded queue. Returns the queues and the estimated durations.
+    """
+    known = [history[key] for key in map(scenario_id, scenarios) if key in history]
+    default = sum(known) / len(known) if known else _DEFAULT_ESTIMATE
+    estimates = [history.get(scenario_id(scenario), default) for scenario in scenarios]
+    queues = [deque() for _ in range(workers)]  # type: List[Deque[int]]
+    loads = [(0.0, worker) for worker in range(workers)]
+    for index in sorted(range(len(scenarios)), key=lambda i: estimates[i], reverse=True):
+        load, worker = heapq.heappop(loads)
+        queues[worker].append(index)
+        heapq.heappush(loads, (load + estimates[index], worker))
+    return queues, estimates
+
+
+def _next_scenario(queues, estimates, worker):
+    # type: (List[Deque[int]], List[float], int) -> int | None
+    if queues[worker]:
+        return queues[worker].popleft()
+    victim = max(range(len(queues)), key=lambda other: sum(estimates[i] for i in queues[other]))
+    if queues[victim]:
+        return queues[victim].pop()
+    return None
+
+
+def _portable_error(error):
+    # type: (BaseException) -> BaseException
+    try:
+        pickle.dumps(error)
+        return error
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+
+
+def _worker(worker, paths, tags, done, assigned):
+    # type: (int, List[str], List[str], multiprocessing.Queue, multiprocessing.Queue) -> None
+    # scenarios are parsed again (in the same order) rather than pickled to the worker
+    load_steps()
+    scenarios = load_scenarios(paths, tags=tags)
+    transport.setup()
+    try:
+        done.put((worker, None))
+        for index in iter(assigned.get, None):
+            result = run_scenario(scenarios[index])
+            step = list(result.scenario.all_steps).index(result.step) if result.step is not None else None
+            error = _portable_error(result.error) if result.error is not None else None
+            done.put((worker, (index, result.status, step, error, result.duration, sorted(result.endpoints))))
+    finally:
+        transport.teardown()
+        timing.flush()
+        logger.flush()
+
+
+def run(scenarios, paths, tags=None, processes=None, history_file=HISTORY_FILE, only=None):
+    # type: (List[Scenario], List[str], List[str], int, str, List[int]) -> List[ScenarioResult]
+    """
+    Runs the scenarios (loaded from `paths` and `tags`), or `only` those at
+    the given indexes, over `processes` worker processes, planned from (and
+    recorded to) the history file. Returns the results of the scenarios run.
+    """
+    selected = list(range(len(scenarios))) if only is None else list(only)
+    processes = max(1, min(processes or os.cpu_count() or 1, len(selected)))
+    history = load_history(history_file)
+    queues, estimates = plan([scenarios[index] for index in selected], history, processes)
+    done = multiprocessing.Queue()
+    assigned = [multiprocessing.Queue() for _ in range(processes)]
+    workers = [
+        multiprocessing.Process(target=_worker, args=(worker, paths, tags, done, assigned[worker]), daemon=True)
+        for worker in range(processes)
+    ]
+    for process in workers:
+        process.start()
+    results = [None] * len(scenarios)  # type: List[ScenarioResult | None]
+    running = set(range(processes))
+    while running:
+        try:
+            worker, outcome = done.get(timeout=1.0)
+        except queue.Empty:
+            dead = [worker for worker in running if not workers[worker].is_alive()]
+            if dead:
+                raise RuntimeError(f"Worker process {dead[0]} exited with code {workers[dead[0]].exitcode}")
+            continue
+        if outcome is not None:
+            index, status, step, error, duration, endpoints = outcome
+            scenario = scenarios[index]
+            step = list(scenario.all_steps)[step] if step is not None else None
+            results[index] = ScenarioResult(scenario, status, step, error, duration, endpoints)
+        position = _next_scenario(queues, estimates, worker)
+        assigned[worker].put(selected[position] if position is not None else None)
+        if position is None:
+            running.discard(worker)
+    for process in workers:
+        process.join()
+    results = [results[index] for index in selected]
+    save_history(history, results, history_file)
+    return results
@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+"""
+Loading and executing scenarios outside of the behave runner.
+
+The execution engines of this package parse the feature files with behave's
+parser, match every step against the step registry populated by `tests.steps`
+and run it against a lightweight, per-scenario `ScenarioContext`.
+
+Note: the hooks of `tests/environment.py` are not called by these engines.
+"""
+
+import contextlib
+import importlib
+import os
+import time
+from typing import Any, Iterable, List
+from behave.model import Scenario, Step
+from behave.tag_expression import TagExpression
+from tests.utils import policy
+from . import cache
+
+
+__all__ = [
+    'ScenarioContext',
+    'ScenarioResult',
+    'new_context',
+    'load_steps',
+    'load_scenarios',
+    'match_steps',
+    'run_step',
+    'run_scenario'
+]
+
+
+STEP_MODULES = [
+    'tests.steps.general'
+]
+
+
+class ScenarioContext(object):
+    """Attribute namespace standing in for behave's Context within one scenario."""
+
+    def __init__(self, **attributes):
+        # type: (Any) -> None
+        self.step = None
+        self.table = None
+        self.text = None
+        self.__dict__.update(attributes)
+
+    @contextlib.contextmanager
+    def use_with_user_mode(self):
+        yield
+
+
+class ScenarioResult(object):
+    """Outcome of one scenario run by an execution engine."""
+    __slots__ = ['scenario', 'status', 'step', 'error', 'duration', 'endpoints', 'reused']
+
+    def __init__(self, scenario, status, step=None, error=None, duration=0.0, endpoints=(), reused=False):
+        # type: (Scenario, str, Step, BaseException, float, Iterable[str], bool) -> None
+        self.scenario = scenario
+        self.status = status
+        self.step = step
+        self.error = error
+        self.duration = duration
+        # the endpoints requested by the scenario, and whether the result is a recorded one (see `impact`)
+        self.endpoints = endpoints
+        self.reused = reused
+
+    @property
+    def passed(self):
+        # type: () -> bool
+        return self.status == "passed"
+
+
+def new_context(scenario, **attributes):
+    # type: (Scenario, Any) -> ScenarioContext
+    """
+    Creates the context of a scenario run, with the request policy of its
+    tags (see `policy`), recording the endpoints it requests.
+    """
+    return ScenarioContext(
+        feature=scenario.feature, request_policy=policy.from_tags(scenario.effective_tags), endpoints=set(),
+        **attributes
+    )
+
+
+def load_steps():
+    # type: () -> None
+    """Registers the step implementations (importing a step module is enough), and loads their cached matches."""
+    for module in STEP_MODULES:
+        importlib.import_module(module)
+    cache.load_matches(STEP_MODULES)
+
+
+def match_steps(scenarios):
+    # type: (Iterable[Scenario]) -> None
+    """Matches every step of the scenarios ahead of the run, and caches the matches for the next runs (and workers)."""
+    for scenario in scenarios:
+        for step in scenario.all_steps:
+            cache.find_match(step)
+    cache.save_matches(STEP_MODULES)
+
+
+def _feature_files(paths):
+    # type: (Iterable[str]) -> List[str]
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in sorted(os.walk(path)):
+                files.extend(os.path.join(root, name) for name in sorted(names) if name.endswith(".feature"))
+        else:
+            files.append(path)
+    return files
+
+
+def load_scenarios(paths, tags=None):
+    # type: (Iterable[str], List[str]) -> List[Scenario]
+    """
+    Parses the feature files (or directories), or loads them from the
+    feature cache, and returns their scenarios, with outlines expanded.
+    """
+    tag_expression = TagExpression(tags or [])
+    scenarios = []
+    for filename in _feature_files(paths):
+        feature = cache.load_feature(filename)
+        if feature is None:
+            continue
+        scenarios.extend(
+            scenario for scenario in feature.walk_scenarios()
+            if scenario.should_run_with_tags(tag_expression)
+        )
+    return scenarios
+
+
+def run_step(context, step):
+    # type: (ScenarioContext, Step) -> None
+    """Runs a single step against the given context."""
+    context.step = step
+    context.table = step.table
+    context.text = step.text
+    match = cache.find_match(step)
+    if match is None:
+        raise NotImplementedError(f"Undefined step: {step.keyword} {step.name}")
+    match.run(context)
+
+
+def run_scenario(scenario, context=None):
+    # type: (Scenario, ScenarioContext) -> ScenarioResult
+    """Runs all the steps of a scenario (background included) in order, stopping at the first failure."""
+    context = context or new_context(scenario)
+    start = time.perf_counter()
+    for step in scenario.all_steps:
+        try:
+            run_step(context, step)
+        except Exception as error:
+            return ScenarioResult(scenario, "failed", step, error, time.perf_counter() - start, context.endpoints)
+    return ScenarioResult(scenario, "passed", duration=time.perf_counter() - start, endpoints=context.endpoints)
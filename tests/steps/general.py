@@ -15,11 +15,10 @@
 # * limitations under the License.
 # **************************************************************************/
 
-import json
 from behave import given, when, then, step
 from behave.runner import Context
 from tests.steps import set_attr
-from tests.utils import calls, gherkin, validators
+from tests.utils import calls, codec, compression, fixtures, gherkin, schema, streaming, timing, uploads, validators
 
 
 @given('a REST API at "{host}"')
@@ -66,13 +65,114 @@ def step_impl(context, with_context_attributes=None):
         set_attr(context, 'query_params', None)
 
 
+# the methods sending the request body of the context
+_BODY_METHODS = frozenset(["POST", "PUT", "PATCH", "DELETE"])
+
+
+def _make_request(context, method, stream=False):
+    # type: (Context, str, bool) -> None
+    body = None
+    if method in _BODY_METHODS:
+        body = context.request_body if hasattr(context, "request_body") else None
+    set_attr(context, 'stream_response', stream)
+    set_attr(context, 'response', calls.make(context, method, context.resource_path, body=body, stream=stream))
+
+
+# the variants with a suffix are registered first, as "{resource_path}" would match the suffix too
+@step(u'the "{scope}" fixture "{name}" from a "{method}" request to "{resource_path}"')
+@step(u'the "{scope}" fixture "{name}" from a "{method}" request to "{resource_path}" with tags "{tags}"')
+@step(u'the "{scope}" fixture "{name}" from a "{method}" request to "{resource_path}" for "{ttl:d}" seconds')
+@step(u'the "{scope}" fixture "{name}" from a "{method}" request to "{resource_path}" for "{ttl:d}" seconds with tags "{tags}"')
+def step_impl(context, scope, name, method, resource_path, ttl=None, tags=""):
+    # type: (Context, str, str, str, str, int, str) -> None
+    def fetch():
+        body = None
+        if method in _BODY_METHODS:
+            body = context.request_body if hasattr(context, "request_body") else None
+        # sent right away, even if the context defers its requests: the fixture is needed by the next steps
+        response = calls.send(context, calls.prepare(context, method, resource_path, body=body))
+        assert response.ok, \
+            f"Fixture '{name}': the {method} request to {resource_path!r} failed with status {response.status_code}"
+        return codec.response_json(response)
+
+    value = fixtures.get_or_create(
+        context, name, fetch, scope=scope, ttl=ttl, tags=[tag.strip() for tag in tags.split(",") if tag.strip()]
+    )
+    set_attr(context, name, value, raise_if_exists=True)
+
+
+@step(u'the fixtures tagged "{tags}" are invalidated')
+def step_impl(context, tags):
+    # type: (Context, str) -> None
+    fixtures.invalidate(*(tag.strip() for tag in tags.split(",") if tag.strip()))
+
+
 @when(u'a "{method}" request is made')
 def step_impl(context, method):
     # type: (Context, str) -> None
-    body = None
-    if method == "POST":
-        body = context.request_body if hasattr(context, "request_body") else None
-    set_attr(context, 'response', calls.make(context, method, context.resource_path, body=body))
+    _make_request(context, method)
+
+
+@when(u'a "{method}" request is made with a streamed response')
+def step_impl(context, method):
+    # type: (Context, str) -> None
+    _make_request(context, method, stream=True)
+
+
+@when(u'the following "{method}" requests are made concurrently')
+@when(u'the following "{method}" requests are made concurrently {with_context_attributes}')
+def step_impl(context, method, with_context_attributes=None):
+    # type: (Context, str, str) -> None
+    rows = gherkin.dot_key_rows_to_bodies(
+        context=context,
+        table=context.table,
+        skip_nulls=False,
+        with_context_attributes=with_context_attributes == "with context attributes"
+    )
+    if method == "GET":
+        responses = calls.make_all(context, method, context.resource_path, query_params=rows)
+    else:
+        responses = calls.make_all(context, method, context.resource_path, bodies=[codec.dumps(row) for row in rows])
+    set_attr(context, 'responses', responses)
+
+
+@then(u'all the response status codes are "{status_code:d}"')
+def step_impl(context, status_code):
+    # type: (Context, int) -> None
+    unexpected = [
+        f"row {row}: {response.status_code}"
+        for row, response in enumerate(context.responses, start=1) if response.status_code != status_code
+    ]
+    assert not unexpected, \
+        f"Expected status code {status_code} for all the {len(context.responses)} requests, " \
+        f"but got {', '.join(unexpected)}"
+
+
+@then(u'the responses are "{is_partial}" compared against the following data table')
+@then(u'the responses are "{is_partial}" compared against the following data table {with_context_attributes}')
+def step_impl(context, is_partial, with_context_attributes=None):
+    # type: (Context, str, str) -> None
+    rows = gherkin.dot_key_rows_to_bodies(
+        context=context,
+        table=context.table,
+        skip_nulls=False,
+        with_context_attributes=with_context_attributes == "with context attributes"
+    )
+    assert len(rows) == len(context.responses), \
+        f"Expected {len(rows)} responses, but got {len(context.responses)}"
+    partial = is_partial in ("partially", "partially unordered")
+    unordered_lists = is_partial == "partially unordered"
+    mismatches = []
+    for row, (expected, response) in enumerate(zip(rows, context.responses), start=1):
+        actual = codec.response_json(response)
+        try:
+            if partial:
+                validators.partial_dict_compare(expected, actual, unordered_lists=unordered_lists)
+            else:
+                assert actual == expected, f"Expected {expected}, but got {actual}"
+        except AssertionError as error:
+            mismatches.append(f"row {row}: {error}")
+    assert not mismatches, f"{len(mismatches)} of {len(rows)} responses do not match:\n" + "\n".join(mismatches)
 
 
 @then(u'the expected response status code is "{status_code:d}"')
@@ -82,10 +182,31 @@ def step_impl(context, status_code):
         f"Expected status code is {status_code}, but got {context.response.status_code}"
 
 
+@then(u'the response time is below "{ms:d}" ms')
+def step_impl(context, ms):
+    # type: (Context, int) -> None
+    elapsed = context.response.elapsed.total_seconds() * 1000
+    assert elapsed < ms, f"Expected response time below {ms} ms, but got {elapsed:.1f} ms"
+
+
+@then(u'the p{percentile:d} response time over "{count:d}" requests is below "{ms:d}" ms')
+def step_impl(context, percentile, count, ms):
+    # type: (Context, int, int, int) -> None
+    call = context.last_call._replace(stream=False)
+    samples = sorted(calls.send(context, call).elapsed.total_seconds() * 1000 for _ in range(count))
+    elapsed = timing.percentile(samples, percentile)
+    assert elapsed < ms, \
+        f"Expected p{percentile} response time over {count} requests below {ms} ms, but got {elapsed:.1f} ms"
+
+
 @then(u'the response body is')
 def step_impl(context):
     # type: (Context) -> None
-    assert context.response.json() == json.loads(context.text)
+    expected = codec.loads(context.text)
+    if getattr(context, "stream_response", False):
+        assert streaming.select(context.response, expected, strict=True) == expected
+    else:
+        assert codec.response_json(context.response) == expected
 
 
 @step('the response body contains the following data table')
@@ -100,13 +221,48 @@ def step_impl(context, is_partial=None, with_context_attributes=None):
         skip_nulls=False,
         with_context_attributes=with_context_attributes == "with context attributes"
     )
-    actual = context.response.json()
-    if is_partial == "partially":
-        validators.partial_dict_compare(expected, actual)
+    partial = is_partial in ("partially", "partially unordered")
+    unordered_lists = is_partial == "partially unordered"
+    if getattr(context, "stream_response", False):
+        actual = streaming.select(context.response, expected, strict=not partial, unordered_lists=unordered_lists)
+    else:
+        actual = codec.response_json(context.response)
+    if partial:
+        with timing.measure("compare", "validators.partial_dict_compare"):
+            validators.partial_dict_compare(expected, actual, unordered_lists=unordered_lists)
     else:
         assert actual == expected, f"Expected {expected}, but got {actual}"
 
 
+@then(u'the response body matches schema "{file}"')
+def step_impl(context, file):
+    # type: (Context, str) -> None
+    with timing.measure("compare", "schema.validate"):
+        schema.validate(schema.compile_file(file), codec.response_json(context.response))
+
+
+@then(u'the response body matches the following schema')
+def step_impl(context):
+    # type: (Context) -> None
+    validator = schema.compile_table(tuple((row[0], row[1]) for row in context.table))
+    with timing.measure("compare", "schema.validate"):
+        schema.validate(validator, codec.response_json(context.response))
+
+
+@then(u'all the responses match schema "{file}"')
+def step_impl(context, file):
+    # type: (Context, str) -> None
+    validator = schema.compile_file(file)
+    mismatches = []
+    for row, response in enumerate(context.responses, start=1):
+        try:
+            schema.validate(validator, codec.response_json(response))
+        except AssertionError as error:
+            mismatches.append(f"row {row}: {error}")
+    assert not mismatches, \
+        f"{len(mismatches)} of {len(context.responses)} responses do not match:\n" + "\n".join(mismatches)
+
+
 @step(u'with the following request body')
 @step(u'with the following request body {with_context_attributes}')
 def step_impl(context, with_context_attributes=None):
@@ -118,3 +274,52 @@ def step_impl(context, with_context_attributes=None):
         with_context_attributes=with_context_attributes == "with context attributes"
     )
     set_attr(context, 'request_body', request_body)
+
+
+@step(u'with the request body from file "{path}"')
+def step_impl(context, path):
+    # type: (Context, str) -> None
+    set_attr(context, 'request_body', uploads.FileBody(path))
+
+
+@step(u'with a generated request body of "{count:d}" items like the following data table')
+@step(u'with a generated request body of "{count:d}" items like the following data table {with_context_attributes}')
+def step_impl(context, count, with_context_attributes=None):
+    # type: (Context, int, str) -> None
+    template = gherkin.dot_key_table_to_body(
+        context=context,
+        table=context.table,
+        skip_nulls=False,
+        with_context_attributes=with_context_attributes == "with context attributes"
+    )
+    set_attr(context, 'request_body', uploads.JsonArrayBody(template, count))
+
+
+@step(u'with compressed responses')
+@step(u'with the response encodings "{encodings}"')
+def step_impl(context, encodings=None):
+    # type: (Context, str) -> None
+    set_attr(context, 'accept_encoding', encodings or ", ".join(compression.RESPONSE_ENCODINGS))
+
+
+@step(u'with the request body compressed with "{encoding}"')
+def step_impl(context, encoding):
+    # type: (Context, str) -> None
+    set_attr(context, 'request_encoding', encoding)
+
+
+@then(u'the response is compressed with "{encoding}"')
+def step_impl(context, encoding):
+    # type: (Context, str) -> None
+    actual = context.response.headers.get("Content-Encoding", "identity")
+    assert actual == encoding, f"Expected a response compressed with {encoding}, but got {actual}"
+
+
+@then(u'the response size on the wire is below "{size:d}" bytes')
+def step_impl(context, size):
+    # type: (Context, int) -> None
+    assert not getattr(context, "stream_response", False), "The size of a streamed response is not accounted"
+    wire_bytes, decoded_bytes = compression.sizes(context.response)
+    assert wire_bytes is not None, "The size of the response on the wire is unknown (compressed and chunked)"
+    assert wire_bytes < size, \
+        f"Expected a response below {size} bytes on the wire, but got {wire_bytes} bytes ({decoded_bytes} decoded)"
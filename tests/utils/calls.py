@@ -15,14 +15,61 @@
 # * limitations under the License.
 # **************************************************************************/
 
-from typing import Dict, Any
+import json
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, Any, AsyncIterator, Iterable, List, Mapping, Tuple
 import urllib.parse
 import requests
+import urllib3.exceptions
 from behave.runner import Context
-from .logger import logger
+from . import cassette, codec, compression, policy, timing, transport
+from .logger import body as log_body, logger
 
 
-__all__ = "make"
+__all__ = [
+    'METHODS',
+    'BULK_CONCURRENCY',
+    'PreparedCall',
+    'AsyncResponse',
+    'prepare',
+    'send',
+    'make',
+    'make_all',
+    'make_async'
+]
+
+
+METHODS = frozenset(["GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"])
+
+# the threads sending the requests of `make_all`
+BULK_CONCURRENCY = int(os.getenv("BULK_REQUEST_CONCURRENCY", "10"))
+
+PreparedCall = namedtuple('PreparedCall', ['method', 'url', 'headers', 'body', 'stream'], defaults=(False,))
+
+
+class AsyncResponse(object):
+    """A fully read response of the async engine, exposing the `requests.Response` attributes used by the steps."""
+
+    def __init__(self, status_code, headers, content, url, elapsed):
+        # type: (int, Mapping[str, str], bytes, str, timedelta) -> None
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.elapsed = elapsed
+
+    @property
+    def text(self):
+        # type: () -> str
+        return self.content.decode("utf-8")
+
+    def json(self, **kwargs):
+        # type: (Any) -> Any
+        return codec.loads(self.content) if not kwargs else json.loads(self.content, **kwargs)
 
 
 def _build_url(base_url, api_version, path=None, query_params=None):
@@ -44,30 +91,189 @@ def _build_url(base_url, api_version, path=None, query_params=None):
     return url
 
 
-def _make_request(method, url, headers=None, body=None):
-    # type: (str, str, Dict[str, str], Dict[str, Any]) -> requests.Response
-    """Executes an HTTP request with the specified method and parameters."""
-    if method == "GET":
-        logger.debug(f"[{method}] to: {url!r}")
-        return requests.get(url, headers=headers)
-    elif method == "POST":
-        logger.debug(f"[{method}] to: {url!r} with body: {body}")
-        return requests.post(url, headers=headers, data=body)
-    else:
+@timing.timed_request
+def _make_request(session, method, url, headers=None, body=None, stream=False, timeout=None):
+    # type: (requests.Session, str, str, Dict[str, str], Any, bool, Tuple[float, float]) -> requests.Response
+    """
+    Executes an HTTP request with the specified method and parameters. The
+    body is a string, bytes or an iterable of byte chunks (see `uploads`),
+    sent with chunked transfer encoding.
+    """
+    if method not in METHODS:
         raise ValueError(f"Unsupported method: {method}")
+    if body is None:
+        logger.debug("[%s] to: %r", method, url)
+    else:
+        logger.debug("[%s] to: %r with body: %s", method, url, log_body(body))
+    return session.request(method, url, headers=headers, data=body, stream=stream, timeout=timeout)
 
 
-def make(context, method, path, body=None):
-    # type: (Context, str, str, Dict[str, Any]) -> requests.Response
-    """Main function to build the URL and make the API call."""
+def prepare(context, method, path, body=None, stream=False, query_params=None):
+    # type: (Context, str, str, Dict[str, Any], bool, Dict[str, str]) -> PreparedCall
+    """
+    Builds the URL and headers of an API call without sending it. The query
+    parameters default to the context's, and the response and request body
+    encodings to the context's `accept_encoding` and `request_encoding` (see
+    `compression`). The endpoint is added to the endpoints of the context,
+    if it records them (see `tests.runner.impact`).
+    """
+    endpoints = getattr(context, "endpoints", None)
+    if endpoints is not None:
+        endpoints.add(f"{method} /{path.strip('/')}")
+    if isinstance(body, str):
+        # JSON is sent in UTF-8 (a str body would be sent in ISO-8859-1)
+        body = body.encode("utf-8")
     headers = {
         'Content-Type': 'application/json',
         'Accept': 'application/json'
     }
+    accept_encoding = getattr(context, "accept_encoding", None) or compression.ACCEPT_ENCODING
+    if accept_encoding:
+        headers['Accept-Encoding'] = accept_encoding
+    request_encoding = getattr(context, "request_encoding", None) or compression.REQUEST_ENCODING
+    if request_encoding and body is not None:
+        body, compressed = compression.compress_body(body, request_encoding)
+        if compressed:
+            headers['Content-Encoding'] = request_encoding
     url = _build_url(
         base_url=context.host,
         api_version=context.api_version,
         path=path,
-        query_params=getattr(context, "query_params", None),
+        query_params=query_params if query_params is not None else getattr(context, "query_params", None),
+    )
+    return PreparedCall(method, url, headers, body, stream)
+
+
+def send(context, call):
+    # type: (Context, PreparedCall) -> requests.Response
+    """
+    Sends a prepared call over the pooled session of the context's host,
+    with the context's request policy (see `policy`), unless its response is
+    served by the cassette (see `cassette`). The latency and status (or
+    error) of the request are passed to `context.record_request`, if the
+    context records them (see `tests.runner.load`).
+    """
+    record_request = getattr(context, "record_request", None)
+    start = time.perf_counter()
+    try:
+        response = cassette.load(call)
+        if response is None:
+            request_policy = getattr(context, "request_policy", None) or policy.DEFAULT
+            session = transport.session(context.host)
+            response = request_policy.send(
+                context.host, call.method, lambda timeout: _make_request(session, *call, timeout=timeout)
+            )
+            cassette.save(call, response)
+    except Exception as error:
+        if record_request is not None:
+            record_request(time.perf_counter() - start, type(error).__name__)
+        raise
+    if record_request is not None:
+        record_request(time.perf_counter() - start, response.status_code)
+    return response
+
+
+def make(context, method, path, body=None, stream=False):
+    # type: (Context, str, str, Dict[str, Any], bool) -> requests.Response | None
+    """
+    Main function to build the URL and make the API call. With `stream`,
+    the response body is left unread (see `streaming.select`).
+
+    The prepared call is kept in `context.last_call`, to be sent again by
+    steps repeating the request. If the context defers its requests (async
+    mode), the call is also left in `context.pending_call` for the execution
+    engine to send, and None is returned.
+    """
+    call = prepare(context, method, path, body=body, stream=stream)
+    context.last_call = call
+    if getattr(context, "defer_requests", False):
+        context.pending_call = call
+        return None
+    return send(context, call)
+
+
+def make_all(context, method, path, bodies=None, query_params=None, concurrency=None):
+    # type: (Context, str, str, List[Any], List[Dict[str, str]], int) -> List[requests.Response]
+    """
+    Makes one API call per body (or query parameters), sent concurrently by
+    at most `concurrency` threads (BULK_REQUEST_CONCURRENCY by default) over
+    the pooled session. Returns the responses in the same order.
+    """
+    count = len(bodies if bodies is not None else query_params)
+    prepared_calls = [
+        prepare(
+            context, method, path,
+            body=bodies[index] if bodies is not None else None,
+            query_params=query_params[index] if query_params is not None else None
+        )
+        for index in range(count)
+    ]
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency or BULK_CONCURRENCY, count))) as executor:
+        # the timings of the requests are recorded under the caller's step
+        return list(executor.map(timing.bind(lambda call: send(context, call)), prepared_calls))
+
+
+async def _async_chunks(body):
+    # type: (Iterable[bytes]) -> AsyncIterator[bytes]
+    # aiohttp streams asynchronous iterables only
+    for chunk in body:
+        yield chunk
+
+
+async def _make_async_request(session, call, timeout):
+    # type: (Any, PreparedCall, Tuple[float, float]) -> AsyncResponse
+    # sends a call over aiohttp, raising its errors as their `requests` counterparts (see `policy`)
+    import aiohttp
+
+    body = call.body
+    if body is None:
+        logger.debug("[%s] to: %r", call.method, call.url)
+    else:
+        logger.debug("[%s] to: %r with body: %s", call.method, call.url, log_body(body))
+        if not isinstance(body, (str, bytes)):
+            body = _async_chunks(body)
+    connect_timeout, read_timeout = timeout
+    start = time.perf_counter()
+    try:
+        async with session.request(
+            call.method, call.url, headers=call.headers, data=body,
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=connect_timeout, sock_read=read_timeout)
+        ) as response:
+            content = await response.read()
+    except aiohttp.ServerTimeoutError as error:
+        # a connect timeout is only told from a read timeout by its message
+        if str(error).startswith("Connection timeout"):
+            raise requests.ConnectTimeout(str(error)) from error
+        raise requests.ReadTimeout(str(error)) from error
+    except aiohttp.ClientConnectorError as error:
+        # the connection could not be opened: the request was not sent
+        raise requests.ConnectionError(urllib3.exceptions.NewConnectionError(call.url, str(error))) from error
+    except aiohttp.ClientConnectionError as error:
+        raise requests.ConnectionError(str(error)) from error
+    return AsyncResponse(
+        status_code=response.status,
+        headers=response.headers,
+        content=content,
+        url=call.url,
+        elapsed=timedelta(seconds=time.perf_counter() - start)
+    )
+
+
+async def make_async(context, session, call):
+    # type: (Context, Any, PreparedCall) -> AsyncResponse | requests.Response
+    """
+    Sends a prepared call over an `aiohttp.ClientSession`, with the context's
+    request policy (see `policy`), and reads the whole response (even if
+    streamed), unless it is served by the cassette.
+    """
+    replayed = cassette.load(call)
+    if replayed is not None:
+        return replayed
+    if call.method not in METHODS:
+        raise ValueError(f"Unsupported method: {call.method}")
+    request_policy = getattr(context, "request_policy", None) or policy.DEFAULT
+    async_response = await request_policy.send_async(
+        context.host, call.method, lambda timeout: _make_async_request(session, call, timeout)
     )
-    return _make_request(method, url, headers=headers, body=body)
+    cassette.save(call, async_response)
+    return async_response
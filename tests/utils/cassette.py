@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+"""
+Record/replay cache of the API responses.
+
+Responses are stored in a cassette directory made of two append-only files:
+    - responses.bin: for each response, a JSON header line (status, reason,
+      headers, elapsed, content encoding and size on the wire) followed by
+      the decoded body bytes.
+    - index.txt: one `<key> <offset> <header length> <body length>` line per
+      response, the key being a hash of the method, URL, body and the
+      selected request headers. The last line of a key wins.
+The index is loaded once, and the bodies are read from a memory map of
+responses.bin, so replaying does not load the whole cassette in memory.
+Both files are appended under an exclusive lock, so parallel workers can
+record in the same cassette.
+
+Configuration (environment variables):
+    - CASSETTE_MODE: 'off' (default), 'record' (send every request and store
+      its response), 'replay' (serve every response from the cassette, with
+      no network; a missing response is an error) or 'record_missing' (serve
+      the stored responses and record the missing ones).
+    - CASSETTE_DIR: the cassette directory (default 'tests/cassettes').
+    - CASSETTE_HEADERS: comma separated request headers taking part in the
+      key (default 'Accept,Content-Type').
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import threading
+from datetime import timedelta
+from typing import Any, Dict, Tuple
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from . import compression
+from .logger import logger
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - no advisory locks (Windows): a single recording worker is assumed
+    fcntl = None
+
+
+__all__ = [
+    'OFF',
+    'RECORD',
+    'REPLAY',
+    'RECORD_MISSING',
+    'setup',
+    'mode',
+    'load',
+    'save',
+    'teardown'
+]
+
+
+OFF = "off"
+RECORD = "record"
+REPLAY = "replay"
+RECORD_MISSING = "record_missing"
+
+_MODES = (OFF, RECORD, REPLAY, RECORD_MISSING)
+# decoded by requests on read, so they do not describe the stored body (the
+# content encoding is stored on its own, and restored on load)
+_DROPPED_HEADERS = ("content-encoding", "transfer-encoding")
+
+_mode = os.getenv("CASSETTE_MODE", OFF).lower()
+_directory = os.getenv("CASSETTE_DIR", os.path.join("tests", "cassettes"))
+_key_headers = [name.strip() for name in os.getenv("CASSETTE_HEADERS", "Accept,Content-Type").split(",") if name.strip()]
+
+_index = None  # type: Dict[str, Tuple[int, int, int]] | None
+_data = None  # type: mmap.mmap | None
+_lock = threading.Lock()
+
+
+def _paths():
+    # type: () -> Tuple[str, str]
+    return os.path.join(_directory, "index.txt"), os.path.join(_directory, "responses.bin")
+
+
+def _key(call):
+    # type: (Any) -> str
+    digest = hashlib.sha1()
+    for part in [call.method, call.url] + [f"{name}:{(call.headers or {}).get(name, '')}" for name in _key_headers]:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    body = call.body
+    if isinstance(body, (dict, list)):
+        body = json.dumps(body, sort_keys=True)
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    elif body is not None and not isinstance(body, bytes):
+        # a streamed body (see `uploads`) is keyed by its description, not read
+        body = repr(body).encode("utf-8")
+    digest.update(body or b"")
+    return digest.hexdigest()
+
+
+def _load_index():
+    # type: () -> Dict[str, Tuple[int, int, int]]
+    global _index
+    if _index is None:
+        _index = {}
+        index_path = _paths()[0]
+        if os.path.exists(index_path):
+            with open(index_path, "r", encoding="utf-8") as index_file:
+                for line in index_file:
+                    key, offset, header_length, body_length = line.split()
+                    _index[key] = (int(offset), int(header_length), int(body_length))
+            logger.debug("Loaded %d responses from the cassette %r", len(_index), _directory)
+    return _index
+
+
+def _map(end):
+    # type: (int) -> mmap.mmap
+    # (re)maps responses.bin when a record lies past the current map (appended since)
+    global _data
+    if _data is None or len(_data) < end:
+        if _data is not None:
+            _data.close()
+        with open(_paths()[1], "rb") as data_file:
+            _data = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+    return _data
+
+
+def setup(mode=None, directory=None):
+    # type: (str, str) -> None
+    """Configures the cassette of the current worker process, closing any open one."""
+    global _mode, _directory
+    teardown()
+    if mode is not None:
+        _mode = mode.lower()
+    if directory is not None:
+        _directory = directory
+    if _mode not in _MODES:
+        raise ValueError(f"Unsupported cassette mode: {_mode!r} (expected one of {', '.join(_MODES)})")
+
+
+def mode():
+    # type: () -> str
+    """Returns the cassette mode of the current worker process."""
+    return _mode
+
+
+def load(call):
+    # type: (Any) -> requests.Response | None
+    """
+    Returns the stored response of a prepared call, or None if it has to be
+    sent. In replay mode, a missing response raises a LookupError instead.
+    """
+    if _mode in (OFF, RECORD):
+        return None
+    with _lock:
+        entry = _load_index().get(_key(call))
+        if entry is None:
+            if _mode == REPLAY:
+                raise LookupError(f"No recorded response in the cassette {_directory!r} for [{call.method}] {call.url!r}")
+            return None
+        offset, header_length, body_length = entry
+        data = _map(offset + header_length + body_length)
+        header = json.loads(data[offset:offset + header_length])
+        content = data[offset + header_length:offset + header_length + body_length]
+    response = requests.Response()
+    response.status_code = header["status"]
+    response.reason = header["reason"]
+    response.headers = CaseInsensitiveDict(header["headers"])
+    if header.get("content_encoding"):
+        response.headers["Content-Encoding"] = header["content_encoding"]
+    # the size on the wire of the recorded response (see `compression.sizes`)
+    response.wire_bytes = header.get("wire_bytes")
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.elapsed = timedelta(seconds=header["elapsed"])
+    response.url = call.url
+    response._content = content
+    response._content_consumed = True
+    return response
+
+
+def save(call, response):
+    # type: (Any, Any) -> None
+    """Stores the response of a sent call, when recording. A streamed response is read whole to be stored."""
+    if _mode not in (RECORD, RECORD_MISSING):
+        return
+    content = response.content
+    header = json.dumps({
+        "status": response.status_code,
+        "reason": getattr(response, "reason", None),
+        "headers": {name: value for name, value in response.headers.items() if name.lower() not in _DROPPED_HEADERS},
+        "elapsed": response.elapsed.total_seconds(),
+        "content_encoding": response.headers.get("Content-Encoding"),
+        "wire_bytes": compression.sizes(response)[0]
+    }).encode("utf-8") + b"\n"
+    key = _key(call)
+    index_path, data_path = _paths()
+    with _lock:
+        os.makedirs(_directory, exist_ok=True)
+        with open(index_path, "a", encoding="utf-8") as index_file, open(data_path, "ab") as data_file:
+            if fcntl is not None:
+                fcntl.flock(index_file.fileno(), fcntl.LOCK_EX)
+            try:
+                offset = data_file.seek(0, os.SEEK_END)
+                data_file.write(header)
+                data_file.write(content)
+                data_file.flush()
+                index_file.write(f"{key} {offset} {len(header)} {len(content)}\n")
+                index_file.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(index_file.fileno(), fcntl.LOCK_UN)
+        _load_index()[key] = (offset, len(header), len(content))
+
+
+def teardown():
+    # type: () -> None
+    """Closes the cassette of the current worker process."""
+    global _index, _data
+    with _lock:
+        if _data is not None:
+            _data.close()
+        _index = None
+        _data = None
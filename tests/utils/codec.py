@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+"""
+JSON codec of the request bodies and responses.
+
+The encoding and decoding go through a faster backend (orjson, or ujson)
+when one is installed, and the standard library otherwise. Every backend
+encodes the same text: compact (no spaces), non-ASCII characters left as is
+(the request bodies are sent in UTF-8). A value or a document a backend
+does not handle (e.g. an integer too large for orjson, a `str` subclass, or
+a NaN to decode) is left to the standard library, so the results do not depend on the
+backend (but for NaN and infinities, not valid JSON, which orjson encodes
+as null). Responses are decoded from their bytes, without building a str.
+
+Configuration (environment variables):
+    - JSON_CODEC: 'auto' (default: orjson, ujson, then the standard library),
+      'orjson', 'ujson' or 'json'.
+"""
+
+import importlib
+import json
+import os
+from typing import Any, Callable, Tuple
+
+
+__all__ = [
+    'BACKEND',
+    'dumps',
+    'loads',
+    'response_json'
+]
+
+
+_BACKENDS = ("orjson", "ujson", "json")
+
+
+def _stdlib_dumps(value):
+    # type: (Any) -> str
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _backend(name):
+    # type: (str) -> Tuple[Callable[[Any], str], Callable[[Any], Any]]
+    if name == "orjson":
+        import orjson
+
+        # the types the standard library encodes differently (or not at all) are passed to `default`, which fails
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS | \
+            orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_SUBCLASS
+        return lambda value: orjson.dumps(value, option=options).decode("utf-8"), orjson.loads
+    if name == "ujson":
+        import ujson
+
+        return lambda value: ujson.dumps(value, ensure_ascii=False, escape_forward_slashes=False), ujson.loads
+    return _stdlib_dumps, json.loads
+
+
+def _select(name):
+    # type: (str) -> str
+    if name != "auto":
+        if name not in _BACKENDS:
+            raise ValueError(f"Unknown JSON codec {name!r}, expected one of: auto, {', '.join(_BACKENDS)}")
+        return name
+    for backend in _BACKENDS:
+        try:
+            importlib.import_module(backend)
+            return backend
+        except ImportError:
+            continue
+
+
+BACKEND = _select(os.getenv("JSON_CODEC", "auto").lower())
+_dumps, _loads = _backend(BACKEND)
+
+
+def dumps(value):
+    # type: (Any) -> str
+    """Encodes a value to (compact) JSON text."""
+    try:
+        return _dumps(value)
+    except (TypeError, ValueError, OverflowError):
+        return _stdlib_dumps(value)
+
+
+def loads(data):
+    # type: (str | bytes) -> Any
+    """Decodes a JSON text (or UTF-8 bytes)."""
+    try:
+        return _loads(data)
+    except (ValueError, OverflowError):
+        # the errors (and the documents only the standard library accepts, e.g. NaN) are the standard library's
+        return json.loads(data)
+
+
+def response_json(response):
+    # type: (Any) -> Any
+    """Decodes the JSON body of a response from its bytes (falling back to `response.json()` for other encodings)."""
+    try:
+        return loads(response.content)
+    except (ValueError, UnicodeDecodeError):
+        return response.json()
+
+
+def test_codec():
+    # type: () -> None
+    documents = [
+        {'a': 1, 'b': [1.5, -2e-7, 1e16, True, False, None], 'c': {'d': 'é😀\n"\\/\t'}},
+        [{'id': i, 'name': f"item-{i}", 'score': i / 3} for i in range(100)],
+        {'big': 2 ** 70, 'keys': {1: 'one', 2.5: 'two and a half'}, 'empty': [{}, [], ""]},
+        "text", 0, None
+    ]
+    for name in _BACKENDS:
+        try:
+            backend_dumps, backend_loads = _backend(name)
+        except ImportError:
+            continue
+        for document in documents:
+            expected = json.loads(_stdlib_dumps(document))
+            # what a backend does not handle is left to the standard library (see `dumps` and `loads`)
+            try:
+                assert json.loads(backend_dumps(document)) == expected, f"{name} encodes {document!r} differently"
+            except (TypeError, ValueError, OverflowError):
+                pass
+            try:
+                assert backend_loads(_stdlib_dumps(document)) == expected, f"{name} decodes {document!r} differently"
+            except (ValueError, OverflowError):
+                pass
+    for document in documents:
+        expected = json.loads(_stdlib_dumps(document))
+        assert json.loads(dumps(document)) == expected, f"Failed to encode {document!r} ({BACKEND})"
+        assert loads(_stdlib_dumps(document).encode("utf-8")) == expected, f"Failed to decode {document!r}"
+    assert dumps({'a': [1, 2], 'b': 'é'}) == '{"a":[1,2],"b":"é"}', "Failed to encode compact JSON"
+    assert loads('{"nan": NaN}')['nan'] != 0, "Failed to decode NaN"
+    print("All tests passed!")
+
+
+if __name__ == '__main__':
+    test_codec()
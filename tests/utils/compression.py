@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+"""
+Compression of the request bodies, negotiation of compressed responses, and
+payload size accounting.
+
+gzip and deflate are always available; br needs the `brotli` package, and
+zstd the `zstandard` package (and, for responses, a urllib3 decoding it).
+The responses are decoded by the HTTP client, and their size is accounted
+twice: as sent by the server (on the wire) and decoded.
+
+Configuration (environment variables):
+    - HTTP_ACCEPT_ENCODING: the encodings of the responses asked for, e.g.
+      'gzip, br'; 'auto' for every available one, 'identity' for none
+      (default: the HTTP client's own, gzip and deflate).
+    - HTTP_REQUEST_ENCODING: the encoding of the request bodies (gzip,
+      deflate, br or zstd; default: none).
+    - HTTP_REQUEST_COMPRESSION_MIN: the size, in bytes, below which a request
+      body is sent as is (default 1024).
+"""
+
+import importlib
+import os
+import zlib
+from typing import Any, Iterable, Iterator, Tuple
+import urllib3.response
+
+
+__all__ = [
+    'ENCODINGS',
+    'RESPONSE_ENCODINGS',
+    'ACCEPT_ENCODING',
+    'REQUEST_ENCODING',
+    'compress_body',
+    'sizes'
+]
+
+
+def _available(module):
+    # type: (str) -> bool
+    try:
+        importlib.import_module(module)
+        return True
+    except ImportError:
+        return False
+
+
+# the encodings of the request bodies, and of the responses (decoded by urllib3)
+ENCODINGS = tuple(
+    ["gzip", "deflate"] + (["br"] if _available("brotli") else []) + (["zstd"] if _available("zstandard") else [])
+)
+RESPONSE_ENCODINGS = [
+    encoding for encoding in ENCODINGS
+    if encoding in ("gzip", "deflate") or
+    (encoding == "br" and hasattr(urllib3.response, "BrotliDecoder")) or
+    (encoding == "zstd" and hasattr(urllib3.response, "ZstdDecoder"))
+]
+
+ACCEPT_ENCODING = os.getenv("HTTP_ACCEPT_ENCODING") or None
+if ACCEPT_ENCODING == "auto":
+    ACCEPT_ENCODING = ", ".join(RESPONSE_ENCODINGS)
+REQUEST_ENCODING = os.getenv("HTTP_REQUEST_ENCODING") or None
+_compression_min = int(os.getenv("HTTP_REQUEST_COMPRESSION_MIN", "1024"))
+
+
+class _Compressor(object):
+    """An incremental compressor, with the interface of zlib's."""
+
+    def __init__(self, encoding):
+        # type: (str) -> None
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unsupported request encoding {encoding!r}, expected one of: {', '.join(ENCODINGS)}")
+        if encoding == "br":
+            import brotli
+
+            compressor = brotli.Compressor()
+            self.compress, self.flush = compressor.process, compressor.finish
+        elif encoding == "zstd":
+            import zstandard
+
+            compressor = zstandard.ZstdCompressor().compressobj()
+            self.compress, self.flush = compressor.compress, compressor.flush
+        else:
+            # gzip has a gzip header and trailer, HTTP's deflate is the zlib format
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 31 if encoding == "gzip" else 15)
+            self.compress, self.flush = compressor.compress, compressor.flush
+
+
+class _CompressedBody(object):
+    """A streamed request body (see `uploads`), compressed as it is read; it can be read again."""
+
+    def __init__(self, body, encoding):
+        # type: (Iterable[bytes], str) -> None
+        self.body = body
+        self.encoding = encoding
+
+    def __iter__(self):
+        # type: () -> Iterator[bytes]
+        compressor = _Compressor(self.encoding)
+        for chunk in self.body:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+    def __repr__(self):
+        # type: () -> str
+        return f"{self.body!r} ({self.encoding})"
+
+
+def compress_body(body, encoding):
+    # type: (bytes | Iterable[bytes], str) -> Tuple[Any, bool]
+    """
+    Returns the body compressed with the encoding, and whether it is (a
+    body smaller than HTTP_REQUEST_COMPRESSION_MIN bytes is left as is).
+    """
+    if isinstance(body, bytes):
+        if len(body) < _compression_min:
+            return body, False
+        compressor = _Compressor(encoding)
+        return compressor.compress(body) + compressor.flush(), True
+    return _CompressedBody(body, encoding), True
+
+
+def sizes(response):
+    # type: (Any) -> Tuple[int | None, int]
+    """
+    Returns the size of a (read) response body on the wire, and decoded. The
+    size on the wire of a compressed response is None if it is unknown (sent
+    in chunks, without a Content-Length). A replayed response (see `cassette`)
+    has the size on the wire of its recording.
+    """
+    decoded = len(response.content)
+    if response.headers.get("Content-Encoding", "identity").lower() not in ("", "identity"):
+        if hasattr(response, "wire_bytes"):
+            return response.wire_bytes, decoded
+        raw = getattr(response, "raw", None)
+        # the bytes read from the socket (not counted by urllib3 for chunked responses)
+        wire = raw.tell() if raw is not None and hasattr(raw, "tell") else 0
+        if not wire and "Content-Length" in response.headers:
+            wire = int(response.headers["Content-Length"])
+        return wire or None, decoded
+    return decoded, decoded
@@ -62,95 +62,160 @@ Example:
     {'a': {'b': {'c': '1', 'd': 2}, 'e': '3'}, 'f': '4', 'g': True, 'h': 1,
     'i': 1.0, 'j': '1.23', 'k': [1, 2, 3], 'l': {1: 2, 3: 4}, 'm': None, 'n': None}
 
+Parse plans:
+------------
+The nested structure only depends on the keys, not on their values. It is
+compiled once per tuple of keys into a "plan" (the keys in processing order
+and a template whose leaves are value slots), kept in an LRU cache of
+DOT_KEY_PLAN_CACHE_SIZE plans (default 256). Parsing a table of an already
+seen shape, e.g. another Examples row of a Scenario Outline, only decodes
+the values and fills them into the template.
+
+Value decoding:
+---------------
+List and dict literals are decoded with `json.loads`, falling back to
+`ast.literal_eval` for Python-only syntax (e.g. `{1: 2}` or `[None]`), so
+both JSON and Python literals are accepted. Decoded scalars (typed, boolean,
+null and plain text values) are memoized, as Scenario Outlines decode the
+same cells over and over.
+
 """
 
 from __future__ import absolute_import
 
 import ast
+import functools
+import json
+import os
 import re
 
 
 __all__ = 'DotKeyDictParser'
 
 
-class DotKeyDictParser(object):
-    __slots__ = ['__dict__']
-    _safe_text = {
-        'bool(true)': True,
-        'bool(false)': False,
-        'none': None,
-        'null': None
-    }
-    _type_map = {
-        'str': str,
-        'float': float,
-        'int': int
-    }
+_PLAN_CACHE_SIZE = int(os.getenv("DOT_KEY_PLAN_CACHE_SIZE", "256"))
+_DECODE_CACHE_SIZE = int(os.getenv("DOT_KEY_DECODE_CACHE_SIZE", "4096"))
+_SEGMENT_PATTERN = re.compile(r'(.*)(\[(\d+)])$|(.+)')
+_TYPED_PATTERN = re.compile(r'(int|float|str)\((.*?)\)')
+_TYPED_PREFIXES = ('int(', 'float(', 'str(')
+_SAFE_TEXT = {
+    'bool(true)': True,
+    'bool(false)': False,
+    'none': None,
+    'null': None
+}
+_TYPE_MAP = {
+    'str': str,
+    'float': float,
+    'int': int
+}
 
-    def __numbervalue(self, value):
-        match = re.match(r'(int|float|str)\((.*?)\)', value)
+
+def _build(ordered, values):
+    super_dict = {}
+    list_items = {}
+    for key, value in zip(ordered, values):
+        obj = super_dict
+        keys = key.split('.')
+        for k in keys[:-1]:
+            k_, _, idx, k__ = _SEGMENT_PATTERN.match(k).groups()
+            k_ = k_ or k__
+            if k_ not in obj:
+                # Considering as list, if idx is not None
+                if idx is not None:
+                    list_items[k] = {}
+                    obj[k_] = [list_items[k]]
+                    obj = obj[k_][0]
+                else:
+                    obj[k_] = {}
+                    obj = obj[k_]
+            else:
+                if idx is not None:
+                    if k not in list_items:
+                        list_items[k] = {}
+                        obj[k_].append(list_items[k])
+                    obj = list_items[k]
+                else:
+                    obj = obj if isinstance(obj[k_], list) else obj[k_]
+        obj[keys[-1]] = value
+    return super_dict
+
+
+@functools.lru_cache(maxsize=_PLAN_CACHE_SIZE)
+def _compile(keys):
+    """
+    Compiles the keys into a parse plan: the keys in processing order and a
+    template built with the index of every value in that order as leaves.
+
+    The template is None if the keys make the structure depend on the values
+    (a list item re-used under another key descends into a value), in which
+    case the values are built directly.
+    """
+    ordered = tuple(sorted(keys, key=len, reverse=True))
+    try:
+        return ordered, _build(ordered, range(len(ordered)))
+    except (TypeError, AttributeError):
+        return ordered, None
+
+
+def _decode_literal(value):
+    # JSON and Python disagree on a few escape sequences (e.g. '\\/'), leave those to literal_eval
+    if '\\' not in value:
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    return ast.literal_eval(value)
+
+
+@functools.lru_cache(maxsize=_DECODE_CACHE_SIZE)
+def _decode_scalar(value):
+    if value.startswith(_TYPED_PREFIXES):
+        match = _TYPED_PATTERN.match(value)
         if match:
-            type_, value = match.groups()
-            function = self._type_map.get(type_, str)
-            return function(value)
+            type_, value_ = match.groups()
+            return _TYPE_MAP[type_](value_)
+    return _SAFE_TEXT.get(value.lower(), value)
 
-    def __load_safe(self, value):
-        # if instance of value is number, return the number
-        if isinstance(value, (int, float)):
-            return value
-        if value.startswith('[') and value.endswith(']'):
-            return ast.literal_eval(value)
-        if value.startswith('{') and value.endswith('}'):
-            return ast.literal_eval(value)
-        number_value = self.__numbervalue(value)
-        if number_value is not None:
-            return number_value
-        return self._safe_text.get(value.lower(), value)
 
-    @staticmethod
-    def __pre_process(data):
-        return {k: v for k, v in data.items() if v != '--na--'}
+def _decode(value):
+    # values which are not text (numbers, context attributes) are already decoded
+    if not isinstance(value, str):
+        return value
+    if (value.startswith('[') and value.endswith(']')) or (value.startswith('{') and value.endswith('}')):
+        return _decode_literal(value)
+    return _decode_scalar(value)
+
 
-    def __add_object(self, name):
-        setattr(self, name, {})
-        return getattr(self, name)
+def _fill(template, values):
+    filled = {}
+    for key, node in template.items():
+        if type(node) is int:
+            filled[key] = values[node]
+        elif type(node) is dict:
+            filled[key] = _fill(node, values)
+        else:
+            filled[key] = [_fill(item, values) for item in node]
+    return filled
 
-    def __unload(self):
-        self.__dict__ = {}
+
+class DotKeyDictParser(object):
+    __slots__ = []
+    _safe_text = _SAFE_TEXT
+    _type_map = _TYPE_MAP
 
     def parse(self, data):
-        super_dict = {}
-        re_pattern = re.compile(r'(.*)(\[(\d+)])$|(.+)')
-        for key in sorted(self.__pre_process(data), key=len, reverse=True):
-            obj = super_dict
-            keys = key.split('.')
-            for k in keys[:-1]:
-                k_, _, idx, k__ = re.match(re_pattern, k).groups()
-                k_ = k_ or k__
-                if k_ not in obj:
-                    # Considering as list, if idx is not None
-                    if idx is not None:
-                        obj[k_] = [self.__add_object(k)]
-                        obj = obj[k_][0]
-                    else:
-                        obj[k_] = {}
-                        obj = obj[k_]
-                else:
-                    if idx is not None:
-                        if not hasattr(self, k):
-                            obj[k_].append(self.__add_object(k))
-                        obj = getattr(self, k)
-                    else:
-                        obj = obj if isinstance(obj[k_], list) else obj[k_]
-            obj[keys[-1]] = self.__load_safe(data[key])
-        self.__unload()
-        return super_dict
+        ordered, template = _compile(tuple(k for k, v in data.items() if v != '--na--'))
+        values = [_decode(data[key]) for key in ordered]
+        if template is None:
+            return _build(ordered, values)
+        return _fill(template, values)
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.__unload()
+        pass
 
 
 def test_dot_key_dict_parser():
@@ -201,5 +266,80 @@ def test_dot_key_dict_parser():
     print("All tests passed!")
 
 
+def test_dot_key_dict_parser_plans():
+    parser = DotKeyDictParser()
+    rows = [
+        ({'items[0].id': 'int(1)', 'items[1].id': 'int(2)', 'meta.name': 'a'},
+         {'items': [{'id': 1}, {'id': 2}], 'meta': {'name': 'a'}}),
+        ({'items[0].id': 'int(3)', 'items[1].id': 'int(4)', 'meta.name': 'b'},
+         {'items': [{'id': 3}, {'id': 4}], 'meta': {'name': 'b'}}),
+        ({'items[0].id': 'int(5)', 'items[1].id': '--na--', 'meta.name': 'c'},
+         {'items': [{'id': 5}], 'meta': {'name': 'c'}}),
+    ]
+    for data, expected in rows:
+        assert parser.parse(data) == expected, "Failed to parse the dictionary with a cached plan"
+
+    # the parsed dictionaries must not share the cached template
+    data, expected = rows[0]
+    parser.parse(data)['items'][0]['id'] = 0
+    assert parser.parse(data) == expected, "Parsed dictionary shares the cached template"
+
+    # a list item re-used under another key descends into a value
+    data = {'p.it[0].zzzzzzzzz': '1', 'rrrrr.it[0].c': '{"k": 1}', 'p.it[0].c.x': '2'}
+    assert _compile(tuple(data))[1] is None, "Compiled a template for value-dependent keys"
+    assert parser.parse(data) == {'p': {'it': [{'zzzzzzzzz': '1'}]}, 'rrrrr': {'it': [{'c': {'k': 1, 'x': '2'}}]}}, \
+        "Failed to parse the dictionary without a template"
+
+    print("All tests passed!")
+
+
+def test_dot_key_dict_parser_decoding():
+    def load_safe(value):
+        # decoding as implemented before the json/memoized fast paths
+        if isinstance(value, (int, float)):
+            return value
+        if value.startswith('[') and value.endswith(']'):
+            return ast.literal_eval(value)
+        if value.startswith('{') and value.endswith('}'):
+            return ast.literal_eval(value)
+        match = re.match(r'(int|float|str)\((.*?)\)', value)
+        if match:
+            type_, value = match.groups()
+            return _TYPE_MAP.get(type_, str)(value)
+        return _SAFE_TEXT.get(value.lower(), value)
+
+    def outcome(function, value):
+        try:
+            result = function(value)
+        except Exception as error:
+            return type(error)
+        return type(result), repr(result)
+
+    values = [
+        1, 1.5, True, '', ' ', 'abc', '1', '1.5', '-2', 'None', 'NULL', 'null', 'none', 'nil',
+        'bool(true)', 'bool(false)', 'BOOL(TRUE)', 'bool(yes)', 'bool()',
+        'int(1)', 'int(-12)', 'int(1)x', 'int(a)', 'int()', 'float(1.00)', 'float(1e3)', 'float(nan)',
+        'str(1.23)', 'str()', 'str(a)b)', 'string(1)', ' int(1)', 'int (1)',
+        '[]', '{}', '[1, 2, 3]', '[1, 2, 3,]', '[1.0, -2, 1e5, 10000000000000000000000]', '["a", "b"]',
+        "['a', 'b']", '[True, False, None]', '[true, false, null]', '[[1, [2, [3]]], {"a": [4]}]',
+        '{"a": 1, "b": [1, 2]}', "{'a': 1}", '{1: 2, 3: 4}', '{"a": 1, "a": 2}', '[(1, 2)]', '{1, 2}',
+        '["\\/"]', '["\\n\\t\\"x\\""]', '["\\u00e9"]', '["\\ud83d\\ude00"]', '["é"]',
+        '[1_000]', '[01]', '["a" "b"]', '[NaN]', '[', ']', '[1] [2]', '{]', '[}',
+        str(list(range(5000))), str({str(i): i for i in range(1000)}),
+    ]
+    for value in values:
+        expected = outcome(load_safe, value)
+        if isinstance(expected, type) and isinstance(outcome(json.loads, value), tuple):
+            # literals rejected by literal_eval may still be valid JSON (e.g. 'true', 'null', 'NaN')
+            expected = outcome(json.loads, value)
+        assert outcome(_decode, value) == expected, f"Failed to decode {value!r}"
+        # memoized values must decode the same on every call
+        assert outcome(_decode, value) == expected, f"Failed to decode {value!r} again"
+
+    print("All tests passed!")
+
+
 if __name__ == '__main__':
     test_dot_key_dict_parser()
+    test_dot_key_dict_parser_plans()
+    test_dot_key_dict_parser_decoding()
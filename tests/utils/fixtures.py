@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+"""
+Fixture cache: the results of an expensive setup (auth tokens, seeded
+resources, lookup data fetched from the API) shared by the scenarios of a
+run or of a feature, instead of being set up again by every scenario.
+
+A fixture is a JSON value with a scope, an expiry time and invalidation
+tags. Every fixture is kept in its own file, so the fixtures are shared by
+the worker processes of a run (behavex, or the parallel runner): the first
+worker needing a fixture creates it while the others wait for it (file
+lock), then read it. Every process keeps the fixtures it has read in
+memory, as long as their files are unchanged.
+
+Scopes:
+    - run: shared by all the scenarios of the run. The run is identified by
+      FIXTURE_RUN_ID, set by `start_run` (from the `before_all` hook) when it
+      is not: behave's process, or the parent process of the behavex workers.
+    - feature: shared by the scenarios of the same feature file (in the run).
+
+The fixtures of a run are kept in their own directory, and `start_run`
+removes those of the other runs: two concurrent runs need their own
+FIXTURE_CACHE_DIR.
+
+Configuration (environment variables):
+    - FIXTURE_CACHE_DIR: the cache directory (default '.fixture_cache').
+    - FIXTURE_TTL: the default time to live of a fixture, in seconds (default 600).
+    - FIXTURE_RUN_ID: the identifier of the run (see above).
+"""
+
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Tuple
+from behave.runner import Context
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - no advisory locks (Windows): the fixtures are only locked within a process
+    fcntl = None
+
+
+__all__ = [
+    'SCOPES',
+    'start_run',
+    'get',
+    'get_or_create',
+    'put',
+    'lookup',
+    'invalidate',
+    'clear'
+]
+
+
+CACHE_DIR = os.getenv("FIXTURE_CACHE_DIR", ".fixture_cache")
+SCOPES = ("run", "feature")
+_ttl = float(os.getenv("FIXTURE_TTL", "600"))
+
+_MISSING = object()
+# fixture file -> (file identity, entry) of the fixtures read by this process
+_entries = {}  # type: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]]
+_lock = threading.Lock()
+# creates the fixtures one at a time, where the files cannot be locked
+_create_lock = threading.Lock()
+
+
+def _start_time(pid):
+    # type: (int) -> str
+    # tells apart the processes reusing a PID (Linux only)
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as stat_file:
+            return stat_file.read().rpartition(b")")[2].split()[19].decode("ascii")
+    except (OSError, IndexError):
+        return ""
+
+
+def _default_run_id():
+    # type: () -> str
+    # the main process of the run: behave's, or the parent of a behavex worker (a multiprocessing child)
+    parent = multiprocessing.parent_process()
+    pid = parent.pid if parent is not None else os.getpid()
+    return f"{pid}-{_start_time(pid)}"
+
+
+def _run_id():
+    # type: () -> str
+    return os.getenv("FIXTURE_RUN_ID") or _default_run_id()
+
+
+def _run_directory():
+    # type: () -> str
+    return os.path.join(CACHE_DIR, hashlib.sha1(_run_id().encode("utf-8")).hexdigest()[:16])
+
+
+def start_run():
+    # type: () -> None
+    """
+    Sets FIXTURE_RUN_ID (inherited by the worker processes), unless it is
+    set, and removes the fixtures (and lock files) of the other runs.
+    """
+    os.environ.setdefault("FIXTURE_RUN_ID", _default_run_id())
+    run_directory = _run_directory()
+    if not os.path.isdir(CACHE_DIR):
+        return
+    for filename in os.listdir(CACHE_DIR):
+        path = os.path.join(CACHE_DIR, filename)
+        if path == run_directory:
+            continue
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # removed by another worker, or still open
+    with _lock:
+        _entries.clear()
+
+
+def _path(context, scope, name):
+    # type: (Context, str, str) -> str
+    if scope == "run":
+        key = f"run:{_run_id()}:{name}"
+    elif scope == "feature":
+        feature = getattr(context, "feature", None)
+        if feature is None:
+            raise ValueError(f"Fixture '{name}' has a feature scope, but no feature is running")
+        key = f"feature:{_run_id()}:{os.path.abspath(feature.filename)}:{name}"
+    else:
+        raise ValueError(f"Unknown fixture scope {scope!r}, expected one of: {', '.join(SCOPES)}")
+    return os.path.join(_run_directory(), hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+
+def _read(path):
+    # type: (str) -> Dict[str, Any] | None
+    # the entry of a fixture file, unless it is missing or expired
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    identity = (stat.st_ino, stat.st_mtime_ns)
+    with _lock:
+        cached = _entries.get(path)
+    if cached is not None and cached[0] == identity:
+        entry = cached[1]
+    else:
+        try:
+            with open(path) as fixture_file:
+                entry = json.load(fixture_file)
+        except (OSError, ValueError):
+            return None
+        with _lock:
+            _entries[path] = (identity, entry)
+    return entry if entry["expires"] > time.time() else None
+
+
+def _write(path, name, value, ttl, tags):
+    # type: (str, str, Any, float | None, Iterable[str]) -> Dict[str, Any]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    entry = {
+        "name": name,
+        "value": value,
+        "expires": time.time() + (_ttl if ttl is None else ttl),
+        "tags": sorted(tags)
+    }
+    temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporary_path, "w") as fixture_file:
+        json.dump(entry, fixture_file)
+    os.replace(temporary_path, path)
+    return entry
+
+
+def get(context, name, scope="run", default=_MISSING):
+    # type: (Context, str, str, Any) -> Any
+    """Returns the value of a fixture; raises KeyError if it is missing or expired, unless a default is given."""
+    entry = _read(_path(context, scope, name))
+    if entry is not None:
+        return entry["value"]
+    if default is _MISSING:
+        raise KeyError(f"Fixture '{name}' not found ({scope} scope)")
+    return default
+
+
+def put(context, name, value, scope="run", ttl=None, tags=()):
+    # type: (Context, str, Any, str, float | None, Iterable[str]) -> None
+    """Saves the value of a fixture, for `ttl` seconds (FIXTURE_TTL by default)."""
+    _write(_path(context, scope, name), name, value, ttl, tags)
+
+
+def get_or_create(context, name, factory, scope="run", ttl=None, tags=()):
+    # type: (Context, str, Callable[[], Any], str, float | None, Iterable[str]) -> Any
+    """
+    Returns the value of a fixture, created by `factory()` if it is missing
+    or expired. The fixture is only created once: the other workers (and
+    threads) wait for it.
+    """
+    path = _path(context, scope, name)
+    entry = _read(path)
+    if entry is not None:
+        return entry["value"]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if fcntl is None:
+        with _create_lock:
+            entry = _read(path)
+            if entry is None:
+                entry = _write(path, name, factory(), ttl, tags)
+        return entry["value"]
+    with open(f"{path}.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            # the fixture may have been created while waiting for the lock
+            entry = _read(path)
+            if entry is None:
+                entry = _write(path, name, factory(), ttl, tags)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+    return entry["value"]
+
+
+def lookup(context, name):
+    # type: (Context, str) -> Any
+    """Returns the fixture `name` of the context's feature, or else of the run; raises KeyError if there is none."""
+    scopes = SCOPES[::-1] if getattr(context, "feature", None) is not None else ("run",)
+    for scope in scopes:
+        entry = _read(_path(context, scope, name))
+        if entry is not None:
+            return entry["value"]
+    raise KeyError(f"Fixture '{name}' not found")
+
+
+def invalidate(*tags):
+    # type: (str) -> int
+    """Removes the fixtures having any of the tags (in every scope and run), returning how many were removed."""
+    tags = set(tags)
+    removed = 0
+    for path in glob.glob(os.path.join(CACHE_DIR, "*", "*.json")):
+        try:
+            with open(path) as fixture_file:
+                entry = json.load(fixture_file)
+        except (OSError, ValueError):
+            continue
+        if tags.intersection(entry.get("tags", ())):
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass  # removed by another worker
+    return removed
+
+
+def clear():
+    # type: () -> None
+    """Removes every fixture."""
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+    with _lock:
+        _entries.clear()
@@ -15,13 +15,15 @@
 # * limitations under the License.
 # **************************************************************************/
 
-import six
+import functools
+import os
 import re
-import json
-from typing import Any, Dict, AnyStr
+import six
+from typing import Any, Dict, AnyStr, List, Tuple
 from behave.model import Table
 from behave.runner import Context
 
+from . import codec, fixtures, timing
 from .dot_key_dict_parser import DotKeyDictParser
 
 """
@@ -32,43 +34,115 @@ __all__ = [
     'parse_table_to_body',
     'parse_table_to_body_json',
     'dot_key_table_to_body',
-    'dot_key_table_to_body_json'
+    'dot_key_table_to_body_json',
+    'dot_key_rows_to_bodies'
 ]
 
 
-_CONTEXT_ATTRIBUTE_PATTERN = re.compile(r"^<ctx\.(\w+)>$")
+# a context attribute path, e.g. <ctx.user> or <ctx.user.name> (attributes, dictionary keys or list indexes)
+_CONTEXT_ATTRIBUTE_PATTERN = re.compile(r"<ctx\.(\w+(?:\.\w+)*)>")
+_TABLE_CACHE_SIZE = int(os.getenv("GHERKIN_TABLE_CACHE_SIZE", "1024"))
+
+# kinds of compiled cells
+_LITERAL = 0  # the cell text (read from the table, by row index)
+_CONTEXT = 1  # the value of a context attribute path (the whole cell)
+_TEMPLATE = 2  # the cell text, with context attribute paths interpolated
+
+
+def _cell_shape(value, skip_nulls, with_context_attributes):
+    # type: (str, bool, bool) -> str | None
+    # the cells compiled from their text (skipped nulls and context attribute paths); None for a literal
+    if (skip_nulls and value == 'null') or (with_context_attributes and "<ctx." in value):
+        return value
+    return None
+
+
+@functools.lru_cache(maxsize=_TABLE_CACHE_SIZE)
+def _compile_table(keys, shapes, skip_nulls, with_context_attributes):
+    # type: (Tuple[str, ...], Tuple[str | None, ...], bool, bool) -> Tuple[Tuple[str, int, Any], ...]
+    # cached by the structure of the table, not its literal values: every example of an outline shares an entry
+    compiled = []
+    for index, (key, value) in enumerate(zip(keys, shapes)):
+        if value is None:
+            compiled.append((key, _LITERAL, index))
+            continue
+        if value == 'null' and skip_nulls:
+            continue
+        parts = _CONTEXT_ATTRIBUTE_PATTERN.split(value) if with_context_attributes else [value]
+        if len(parts) == 1:
+            # not a context attribute path after all (e.g. '<ctx.>'): a literal
+            compiled.append((key, _LITERAL, index))
+        elif len(parts) == 3 and not parts[0] and not parts[2]:
+            compiled.append((key, _CONTEXT, tuple(parts[1].split("."))))
+        else:
+            # split() alternates text and paths: paths are at the odd positions
+            compiled.append((key, _TEMPLATE, tuple(
+                part if position % 2 == 0 else tuple(part.split(".")) for position, part in enumerate(parts)
+            )))
+    return tuple(compiled)
+
+
+def _lookup(context, path, roots):
+    # type: (Context, Tuple[str, ...], Dict[str, Any]) -> Any
+    # the context is a stack of layers, so every attribute is only looked up once per table
+    name = path[0]
+    if name not in roots:
+        if hasattr(context, name):
+            roots[name] = getattr(context, name)
+        else:
+            # not set by the scenario: a cached fixture of the feature or the run (see `fixtures`)
+            try:
+                roots[name] = fixtures.lookup(context, name)
+            except KeyError:
+                raise AttributeError(f"Context attribute '{name}' not found")
+    value = roots[name]
+    for depth, segment in enumerate(path[1:], start=2):
+        if isinstance(value, dict) and segment in value:
+            value = value[segment]
+        elif isinstance(value, list) and segment.isdigit() and int(segment) < len(value):
+            value = value[int(segment)]
+        elif hasattr(value, segment):
+            value = getattr(value, segment)
+        else:
+            raise AttributeError(f"Context attribute '{'.'.join(path[:depth])}' not found")
+    return value
 
 
-def _ask_context_value(context, value):
-    # type: (Context, str) -> Any
-    context_attribute = _CONTEXT_ATTRIBUTE_PATTERN.findall(value)
-    if context_attribute:
-        if not hasattr(context, context_attribute[0]):
-            raise AttributeError(f"Context attribute '{context_attribute[0]}' not found")
-        value = getattr(context, context_attribute[0])
-    return value
+def _format_value(value):
+    # type: (Any) -> str
+    return value if isinstance(value, str) else codec.dumps(value)
 
 
 def parse_table_to_body(context, table, skip_nulls=True, with_context_attributes=False):
     # type: (Context, Table, bool, bool) -> Dict[str, Any]
+    values = [row[1] for row in table]
+    compiled = _compile_table(
+        tuple(str(row[0]) for row in table),
+        tuple(_cell_shape(value, skip_nulls, with_context_attributes) for value in values),
+        skip_nulls,
+        with_context_attributes
+    )
+    roots = {}  # type: Dict[str, Any]
     body = {}
-    for row in table:
-        if row[1] != 'null' or not skip_nulls:
-            key = str(row[0])
-            if with_context_attributes:
-                value = _ask_context_value(context, row[1])
-            else:
-                value = row[1]
-            if isinstance(value, six.text_type) and \
-                    value.startswith('[') and value.endswith(']'):
-                value = json.loads(value)
-            body[key] = value
+    for key, kind, payload in compiled:
+        if kind == _LITERAL:
+            value = values[payload]
+        elif kind == _CONTEXT:
+            value = _lookup(context, payload, roots)
+        else:
+            value = "".join(
+                part if isinstance(part, str) else _format_value(_lookup(context, part, roots)) for part in payload
+            )
+        if isinstance(value, six.text_type) and \
+                value.startswith('[') and value.endswith(']'):
+            value = codec.loads(value)
+        body[key] = value
     return body
 
 
 def parse_table_to_body_json(context, table, skip_nulls=True, with_context_attributes=False):
     # type: (Context, Table, bool, bool) -> AnyStr
-    return json.dumps(
+    return codec.dumps(
         parse_table_to_body(
             context=context,
             table=table,
@@ -80,20 +154,19 @@ def parse_table_to_body_json(context, table, skip_nulls=True, with_context_attri
 
 def dot_key_table_to_body(context, table, skip_nulls=True, with_context_attributes=False):
     # type: (Context, Table, bool, bool) -> Dict[str, Any]
-    with DotKeyDictParser() as parser:
-        return parser.parse(
-            parse_table_to_body(
-                context=context,
-                table=table,
-                skip_nulls=skip_nulls,
-                with_context_attributes=with_context_attributes
-            )
-        )
+    body = parse_table_to_body(
+        context=context,
+        table=table,
+        skip_nulls=skip_nulls,
+        with_context_attributes=with_context_attributes
+    )
+    with DotKeyDictParser() as parser, timing.measure("parse", "DotKeyDictParser.parse"):
+        return parser.parse(body)
 
 
 def dot_key_table_to_body_json(context, table, skip_nulls=True, with_context_attributes=False):
     # type: (Context, Table, bool, bool) -> AnyStr
-    return json.dumps(
+    return codec.dumps(
         dot_key_table_to_body(
             context=context,
             table=table,
@@ -101,3 +174,17 @@ def dot_key_table_to_body_json(context, table, skip_nulls=True, with_context_att
             with_context_attributes=with_context_attributes
         )
     )
+
+
+def dot_key_rows_to_bodies(context, table, skip_nulls=True, with_context_attributes=False):
+    # type: (Context, Table, bool, bool) -> List[Dict[str, Any]]
+    """Parses every row of a table whose headings are dot keys into its own dictionary."""
+    return [
+        dot_key_table_to_body(
+            context=context,
+            table=Table(["param", "value"], rows=[[key, value] for key, value in zip(table.headings, row)]),
+            skip_nulls=skip_nulls,
+            with_context_attributes=with_context_attributes
+        )
+        for row in table
+    ]
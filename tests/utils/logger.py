@@ -15,13 +15,46 @@
 # * limitations under the License.
 # **************************************************************************/
 
+"""
+Non-blocking logging.
+
+The root logger only enqueues its records (`QueueHandler`); a `QueueListener`
+thread formats and writes them, so a step never waits on stderr. Messages use
+lazy %-style arguments, formatted only for the records that are emitted (when
+enqueued, so the arguments changed by the caller afterwards do not count).
+
+Configuration (environment variables):
+    - LOG_LEVEL: DEBUG, INFO (default), WARNING, ERROR or CRITICAL.
+    - LOG_BODY_MAX: maximum number of characters of a logged body (default
+      1024, 0 for no limit), see `body`.
+    - LOG_BODY_SAMPLE: fraction of the bodies logged in full (default 1.0).
+    - LOG_JSON_DIR: if set, every worker process also writes its records as
+      JSON lines to `<LOG_JSON_DIR>/log-<pid>.jsonl` (see `merge_json_logs`).
+"""
+
+import atexit
+import glob
+import heapq
+import json
 import os
 import logging
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, List
 
-__all__ = "logger"
+__all__ = [
+    'logger',
+    'body',
+    'flush',
+    'merge_json_logs'
+]
 
 
 _log_level = os.getenv("LOG_LEVEL", "INFO").upper()
+_body_max = int(os.getenv("LOG_BODY_MAX", "1024"))
+_body_sample = float(os.getenv("LOG_BODY_SAMPLE", "1.0"))
+_json_dir = os.getenv("LOG_JSON_DIR")
 
 _log_level_map = {
     "DEBUG": logging.DEBUG,
@@ -31,9 +64,132 @@ _log_level_map = {
     "CRITICAL": logging.CRITICAL,
 }
 
+
+class _Body(object):
+    """A request/response body, truncated (or left out if not sampled) only when the record is formatted."""
+    __slots__ = ['value']
+
+    def __init__(self, value):
+        # type: (Any) -> None
+        self.value = value
+
+    def __str__(self):
+        # type: () -> str
+        if self.value is None:
+            return "None"
+        if _body_sample < 1.0 and random.random() >= _body_sample:
+            return "<body not sampled>"
+        text = self.value.decode("utf-8", "replace") if isinstance(self.value, bytes) else str(self.value)
+        if _body_max and len(text) > _body_max:
+            return f"{text[:_body_max]}... ({len(text) - _body_max} more characters)"
+        return text
+
+
+class _JsonFormatter(logging.Formatter):
+
+    def format(self, record):
+        # type: (logging.LogRecord) -> str
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "pid": record.process,
+            "thread": record.threadName,
+            "message": record.getMessage()
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # formatted when enqueued (see `_DeferredQueueHandler.prepare`)
+            entry["exception"] = record.exc_text
+        return json.dumps(entry)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Enqueues the records of the enabled levels with their message formatted;
+    the lines are formatted and written by the listener thread.
+    """
+
+    def prepare(self, record):
+        # type: (logging.LogRecord) -> logging.LogRecord
+        # only called for the enabled levels: the arguments are formatted while they still hold the logged values
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # tracebacks are not picklable nor meant to outlive the caller's frame
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _start():
+    # type: () -> QueueListener
+    handlers = [logging.StreamHandler()]  # type: List[logging.Handler]
+    handlers[0].setFormatter(logging.Formatter('%(asctime)s [%(levelname)s]: %(message)s'))
+    if _json_dir:
+        os.makedirs(_json_dir, exist_ok=True)
+        json_handler = logging.FileHandler(os.path.join(_json_dir, f"log-{os.getpid()}.jsonl"), encoding="utf-8")
+        json_handler.setFormatter(_JsonFormatter())
+        handlers.append(json_handler)
+    handler.queue = queue.SimpleQueue()
+    new_listener = QueueListener(handler.queue, *handlers)
+    new_listener.start()
+    return new_listener
+
+
+def _restart_in_child():
+    # type: () -> None
+    # the listener thread is not copied into a forked worker: give it its own queue, listener and JSON file
+    global listener
+    listener = _start()
+
+
+def _stop():
+    # type: () -> None
+    listener.stop()
+    for listener_handler in listener.handlers:
+        listener_handler.close()
+
+
+def flush():
+    # type: () -> None
+    """
+    Waits until every enqueued record is written. To be called by the worker
+    processes before exiting, as they skip the `atexit` handlers.
+    """
+    global listener
+    _stop()
+    listener = _start()
+
+
+def body(value):
+    # type: (Any) -> _Body
+    """Wraps a body logged as a %-style argument, to be truncated (and sampled) only if the record is emitted."""
+    return _Body(value)
+
+
+def merge_json_logs(directory=None, output=None):
+    # type: (str, str) -> str
+    """
+    Merges the JSON-lines logs of every worker process (by time) into one
+    file, `<directory>/merged.jsonl` by default, and returns its path.
+    """
+    directory = directory or _json_dir
+    output = output or os.path.join(directory, "merged.jsonl")
+    files = [open(path, "r", encoding="utf-8") for path in sorted(glob.glob(os.path.join(directory, "log-*.jsonl")))]
+    try:
+        with open(output, "w", encoding="utf-8") as merged:
+            merged.writelines(heapq.merge(*files, key=lambda line: json.loads(line)["time"]))
+    finally:
+        for log_file in files:
+            log_file.close()
+    return output
+
+
 logger = logging.getLogger()
-handler = logging.StreamHandler()
-formatter = logging.Formatter('%(asctime)s [%(levelname)s]: %(message)s')
-handler.setFormatter(formatter)
+handler = _DeferredQueueHandler(queue.SimpleQueue())
 logger.addHandler(handler)
 logger.setLevel(_log_level_map.get(_log_level, logging.INFO))
+listener = _start()
+atexit.register(_stop)
+os.register_at_fork(after_in_child=_restart_in_child)
@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+"""
+Request policy: timeouts, retries and a per-host circuit breaker.
+
+Every request is sent with connect/read timeouts. Requests failing with a
+retried status code or a connection error are retried, waiting for an
+exponential backoff with full jitter (or the `Retry-After` of the response,
+if shorter than the maximum backoff). A read timeout, or a connection error
+once the connection was opened (e.g. reset), is only retried for the
+idempotent methods, as the request may have been processed.
+
+The asyncio engine sends its requests with the same timeouts, retries and
+circuit breakers (see `RequestPolicy.send_async`).
+
+Every host has a circuit breaker: after CIRCUIT_BREAKER_THRESHOLD consecutive
+failures (connection errors and timeouts: any response, whatever its status,
+means the host is up), the requests to the host fail fast with a `CircuitOpenError` for CIRCUIT_BREAKER_RESET seconds,
+then a single trial request decides whether the circuit closes again.
+
+Defaults (environment variables):
+    - HTTP_CONNECT_TIMEOUT: connect timeout, in seconds (default 5).
+    - HTTP_READ_TIMEOUT: read timeout, in seconds (default 30).
+    - HTTP_RETRIES: number of retries (default 0).
+    - HTTP_RETRY_ON: comma separated status codes to retry (default 502,503,504).
+    - HTTP_RETRY_BACKOFF: base backoff, in seconds (default 0.1).
+    - HTTP_RETRY_BACKOFF_MAX: maximum backoff, in seconds (default 5).
+    - CIRCUIT_BREAKER_THRESHOLD: consecutive failures opening the circuit of a
+      host (default 5, 0 to disable the circuit breaker).
+    - CIRCUIT_BREAKER_RESET: seconds before a trial request (default 30).
+
+Features and scenarios can override the defaults with tags, e.g.
+`@retries=3 @retry_on=503:429 @timeout=60 @connect_timeout=2 @backoff=0.5`.
+"""
+
+import asyncio
+import functools
+import os
+import random
+import threading
+import time
+from collections import namedtuple
+from typing import Any, Awaitable, Callable, Dict, Iterable, Tuple
+import requests
+import urllib3.exceptions
+
+
+__all__ = [
+    'CircuitOpenError',
+    'RequestPolicy',
+    'DEFAULT',
+    'from_tags',
+    'stats',
+    'reset'
+]
+
+
+_IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+
+_breaker_threshold = int(os.getenv("CIRCUIT_BREAKER_THRESHOLD", "5"))
+_breaker_reset = float(os.getenv("CIRCUIT_BREAKER_RESET", "30"))
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+class _CircuitBreaker(object):
+    """Consecutive failures of one host, and when its circuit (if open) lets a trial request through."""
+
+    def __init__(self):
+        # type: () -> None
+        self.failures = 0
+        self.open_until = 0.0
+        self.trial = False
+        self.lock = threading.Lock()
+
+    def before_request(self, host):
+        # type: (str) -> None
+        if not _breaker_threshold:
+            return
+        with self.lock:
+            if self.failures < _breaker_threshold:
+                return
+            now = time.monotonic()
+            if now < self.open_until or self.trial:
+                _count("rejected")
+                raise CircuitOpenError(
+                    f"Circuit open for {host}: {self.failures} consecutive failures, "
+                    f"next trial in {max(self.open_until - now, 0.0):.1f}s"
+                )
+            # half-open: this request is the trial
+            self.trial = True
+
+    def release(self):
+        # type: () -> None
+        # the request failed before reaching the host: neither a success nor a failure
+        with self.lock:
+            self.trial = False
+
+    def record(self, failed):
+        # type: (bool) -> None
+        with self.lock:
+            self.trial = False
+            if failed:
+                self.failures += 1
+                if _breaker_threshold and self.failures >= _breaker_threshold:
+                    self.open_until = time.monotonic() + _breaker_reset
+            else:
+                self.failures = 0
+
+
+_breakers = {}  # type: Dict[str, _CircuitBreaker]
+_stats = {"requests": 0, "retries": 0, "retry_wait": 0.0, "rejected": 0}
+_lock = threading.Lock()
+
+
+def _count(name, value=1):
+    # type: (str, float) -> None
+    with _lock:
+        _stats[name] += value
+
+
+def _breaker(host):
+    # type: (str) -> _CircuitBreaker
+    with _lock:
+        if host not in _breakers:
+            _breakers[host] = _CircuitBreaker()
+        return _breakers[host]
+
+
+def _connect_failed(error):
+    # type: (requests.ConnectionError) -> bool
+    # the connection could not be opened, so the request was not sent
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = error.args[0] if error.args else None
+    return isinstance(getattr(reason, "reason", reason), urllib3.exceptions.NewConnectionError)
+
+
+def _retry_after(response):
+    # type: (requests.Response) -> float | None
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None  # absent, or an HTTP date
+
+
+class RequestPolicy(namedtuple('RequestPolicy', [
+    'connect_timeout', 'read_timeout', 'retries', 'retry_on', 'backoff', 'backoff_max'
+])):
+    """Timeouts and retries of the requests (see the module documentation)."""
+    __slots__ = ()
+
+    @property
+    def timeout(self):
+        # type: () -> Tuple[float, float]
+        return self.connect_timeout, self.read_timeout
+
+    def _backoff(self, attempt, response=None):
+        # type: (int, Any) -> float
+        delay = random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+        retry_after = _retry_after(response) if response is not None else None
+        if retry_after is not None:
+            delay = min(retry_after, self.backoff_max)
+        return delay
+
+    def _retry_error(self, breaker, method, attempt, error):
+        # type: (_CircuitBreaker, str, int, BaseException) -> bool
+        # records a failed attempt, returning whether it is retried
+        if isinstance(error, requests.ConnectionError):
+            breaker.record(failed=True)
+            return attempt < self.retries and (method in _IDEMPOTENT_METHODS or _connect_failed(error))
+        if isinstance(error, requests.ReadTimeout):
+            breaker.record(failed=True)
+            return attempt < self.retries and method in _IDEMPOTENT_METHODS
+        breaker.release()
+        return False
+
+    def _retry_response(self, breaker, attempt, response):
+        # type: (_CircuitBreaker, int, Any) -> bool
+        # the host answered: a success for the circuit breaker, whatever the status (which tests may expect)
+        breaker.record(failed=False)
+        return response.status_code in self.retry_on and attempt < self.retries
+
+    def _retry_delay(self, attempt, response):
+        # type: (int, Any) -> float
+        delay = self._backoff(attempt, response)
+        _count("retries")
+        _count("retry_wait", delay)
+        return delay
+
+    def send(self, host, method, send):
+        # type: (str, str, Callable[[Tuple[float, float]], requests.Response]) -> requests.Response
+        """Sends a request with `send(timeout)`, retrying it and tracking the host's circuit breaker."""
+        breaker = _breaker(host)
+        attempt = 0
+        while True:
+            breaker.before_request(host)
+            _count("requests")
+            response = None
+            try:
+                response = send(self.timeout)
+            except BaseException as error:
+                if not self._retry_error(breaker, method, attempt, error):
+                    raise
+            else:
+                if not self._retry_response(breaker, attempt, response):
+                    return response
+                response.close()
+            time.sleep(self._retry_delay(attempt, response))
+            attempt += 1
+
+    async def send_async(self, host, method, send):
+        # type: (str, str, Callable[[Tuple[float, float]], Awaitable[Any]]) -> Any
+        """
+        Sends a request with `await send(timeout)` (raising the `requests`
+        exceptions), retrying it and tracking the host's circuit breaker.
+        """
+        breaker = _breaker(host)
+        attempt = 0
+        while True:
+            breaker.before_request(host)
+            _count("requests")
+            response = None
+            try:
+                response = await send(self.timeout)
+            except BaseException as error:
+                if not self._retry_error(breaker, method, attempt, error):
+                    raise
+            else:
+                if not self._retry_response(breaker, attempt, response):
+                    return response
+            await asyncio.sleep(self._retry_delay(attempt, response))
+            attempt += 1
+
+
+DEFAULT = RequestPolicy(
+    connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", "5")),
+    read_timeout=float(os.getenv("HTTP_READ_TIMEOUT", "30")),
+    retries=int(os.getenv("HTTP_RETRIES", "0")),
+    retry_on=frozenset(int(code) for code in os.getenv("HTTP_RETRY_ON", "502,503,504").split(",") if code.strip()),
+    backoff=float(os.getenv("HTTP_RETRY_BACKOFF", "0.1")),
+    backoff_max=float(os.getenv("HTTP_RETRY_BACKOFF_MAX", "5"))
+)
+
+_TAGS = {
+    "timeout": ("read_timeout", float),
+    "connect_timeout": ("connect_timeout", float),
+    "retries": ("retries", int),
+    "retry_on": ("retry_on", lambda value: frozenset(int(code) for code in value.split(":"))),
+    "backoff": ("backoff", float),
+    "backoff_max": ("backoff_max", float)
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _from_tags(tags):
+    # type: (Tuple[str, ...]) -> RequestPolicy
+    overrides = {}
+    for tag in tags:
+        name, _, value = tag.partition("=")
+        if name in _TAGS and value:
+            field, convert = _TAGS[name]
+            try:
+                overrides[field] = convert(value)
+            except ValueError:
+                raise ValueError(f"Invalid request policy tag: @{tag}")
+    return DEFAULT._replace(**overrides)
+
+
+def from_tags(tags):
+    # type: (Iterable[str]) -> RequestPolicy
+    """Returns the default policy, overridden by the policy tags (later tags win, e.g. scenario over feature)."""
+    return _from_tags(tuple(str(tag) for tag in tags))
+
+
+def stats():
+    # type: () -> Dict[str, float]
+    """Returns the number of requests (attempts), retries, rejected requests and the time spent in backoff."""
+    with _lock:
+        return dict(_stats)
+
+
+def reset():
+    # type: () -> None
+    """Closes every circuit and clears the statistics."""
+    with _lock:
+        _breakers.clear()
+        _stats.update(requests=0, retries=0, retry_wait=0.0, rejected=0)
@@ -0,0 +1,439 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+r"""
+Schema validation of the responses.
+
+A schema is compiled once into a tree of closures (one per schema node, with
+the keyword checks resolved at compile time), cached, and then run against
+any number of documents. Two schema formats are supported:
+
+* JSON Schema files (looked up in SCHEMA_DIR, default 'tests/schemas'), with
+  the keywords: type, enum, const, properties, required,
+  additionalProperties, items, minItems, maxItems, minimum, maximum,
+  exclusiveMinimum, exclusiveMaximum, minLength, maxLength, pattern, allOf,
+  anyOf, oneOf, not and local $ref ('#/definitions/...' or '#/$defs/...').
+  Other keywords are rejected, rather than silently ignored.
+
+* dot-key tables, in the format of the other data tables: the type of every
+  key, e.g.
+    | param             | value     |
+    | data.id           | int       |
+    | data.name         | str\|null |
+    | data.tags[]       | str       |
+    | data.items[].code | int       |
+    | data.comment      | str?      |
+  with the types int, float, number, str, bool, null, list, dict and any,
+  '|' for alternatives (escaped as '\|' in a Gherkin table), '[]' for every
+  item of a list and a trailing '?' for an optional key.
+
+Values are compared as in JSON Schema: booleans are not numbers (`true` is
+not in the enum `[1]`), and a number without a fractional part (`1.0`) is
+an integer.
+"""
+
+import functools
+import json
+import operator
+import os
+import re
+from typing import Any, Callable, Dict, List, Tuple
+
+
+__all__ = [
+    'compile_schema',
+    'compile_file',
+    'compile_table',
+    'validate'
+]
+
+
+_schema_dir = os.getenv("SCHEMA_DIR", os.path.join("tests", "schemas"))
+
+# (value, path node, errors) -> None; the path node is the root path or a (parent node, key, is_index) tuple
+Validator = Callable[[Any, Any, List[str]], None]
+
+_JSON_TYPES = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "integer": lambda value: (isinstance(value, int) and not isinstance(value, bool)) or
+    (isinstance(value, float) and value.is_integer()),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None
+}
+
+_PYTHON_TYPES = {
+    "object": (dict,),
+    "array": (list,),
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "null": (type(None),)
+}
+
+_TABLE_TYPES = {
+    "int": {"type": "integer"},
+    "float": {"type": "number"},
+    "number": {"type": "number"},
+    "str": {"type": "string"},
+    "bool": {"type": "boolean"},
+    "null": {"type": "null"},
+    "list": {"type": "array"},
+    "dict": {"type": "object"},
+    "any": {}
+}
+
+_KEYWORDS = {
+    "type", "enum", "const", "properties", "required", "additionalProperties", "items", "minItems", "maxItems",
+    "minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum", "minLength", "maxLength", "pattern",
+    "allOf", "anyOf", "oneOf", "not", "$ref",
+    # annotations, not validated
+    "$schema", "$id", "$comment", "title", "description", "default", "examples", "definitions", "$defs"
+}
+
+
+def _format_path(node):
+    # type: (Any) -> str
+    parts = []
+    while isinstance(node, tuple):
+        node, key, is_index = node
+        parts.append(f"[{key}]" if is_index else f".{key}")
+    return node + "".join(reversed(parts))
+
+
+def _type_name(value):
+    # type: (Any) -> str
+    for name, check in _JSON_TYPES.items():
+        if check(value):
+            return name
+    return type(value).__name__
+
+
+def _json_equal(value, other):
+    # type: (Any, Any) -> bool
+    # equality as in JSON Schema: booleans are not numbers, and 1 equals 1.0
+    if isinstance(value, bool) or isinstance(other, bool):
+        return value is other
+    if isinstance(value, dict) and isinstance(other, dict):
+        return value.keys() == other.keys() and all(_json_equal(value[key], other[key]) for key in value)
+    if isinstance(value, list) and isinstance(other, list):
+        return len(value) == len(other) and all(_json_equal(item, other_item) for item, other_item in zip(value, other))
+    if isinstance(value, (dict, list)) or isinstance(other, (dict, list)):
+        return False
+    return value == other
+
+
+def _compile(schema, root):
+    # type: (Dict[str, Any] | bool, Dict[str, Any]) -> Validator
+    if schema is True or schema == {}:
+        return lambda value, node, errors: None
+    if schema is False:
+        return lambda value, node, errors: errors.append(f"No value is allowed at '{_format_path(node)}'")
+    unknown = set(schema) - _KEYWORDS
+    if unknown:
+        raise ValueError(f"Unsupported JSON Schema keyword(s): {', '.join(sorted(unknown))}")
+    checks = []  # type: List[Validator]
+
+    if "$ref" in schema:
+        reference = schema["$ref"]
+        match = re.match(r"^#/(definitions|\$defs)/(.+)$", reference)
+        if not match or match.group(2) not in root.get(match.group(1), {}):
+            raise ValueError(f"Unsupported or unknown JSON Schema reference: {reference!r}")
+        # compiled on first use, so recursive definitions do not recurse here
+        target = root[match.group(1)][match.group(2)]
+        compiled = []
+
+        def check_reference(value, node, errors):
+            if not compiled:
+                compiled.append(_compile(target, root))
+            compiled[0](value, node, errors)
+        checks.append(check_reference)
+
+    if "type" in schema:
+        names = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        unknown_types = [name for name in names if name not in _PYTHON_TYPES]
+        if unknown_types:
+            raise ValueError(
+                f"Unsupported schema type(s): {', '.join(map(str, unknown_types))} "
+                f"(expected {', '.join(_PYTHON_TYPES)})"
+            )
+        python_types = tuple(python_type for name in names for python_type in _PYTHON_TYPES[name])
+        # bool is an int in Python, but not a number in JSON; a float without a fractional part is an integer
+        reject_bool = "boolean" not in names
+        integral_floats = "integer" in names and "number" not in names
+        expected_types = " or ".join(names)
+
+        def check_type(value, node, errors):
+            if isinstance(value, python_types) and not (reject_bool and value.__class__ is bool):
+                return
+            if integral_floats and value.__class__ is float and value.is_integer():
+                return
+            errors.append(f"Expected {expected_types} at '{_format_path(node)}', but got {_type_name(value)}")
+        checks.append(check_type)
+
+    if "enum" in schema or "const" in schema:
+        allowed = schema["enum"] if "enum" in schema else [schema["const"]]
+
+        def check_enum(value, node, errors):
+            if not any(_json_equal(value, allowed_value) for allowed_value in allowed):
+                errors.append(f"Value at '{_format_path(node)}' must be one of {allowed}, but got {value!r}")
+        checks.append(check_enum)
+
+    if "properties" in schema or "required" in schema or "additionalProperties" in schema:
+        properties = tuple(
+            (key, _compile(subschema, root)) for key, subschema in schema.get("properties", {}).items()
+        )
+        required = tuple(schema.get("required", ()))
+        additional = schema.get("additionalProperties", True)
+        known = frozenset(schema.get("properties", {}))
+        check_additional = None if additional is True else _compile(additional, root)
+
+        def check_object(value, node, errors):
+            if not isinstance(value, dict):
+                return
+            for key in required:
+                if key not in value:
+                    errors.append(f"Key '{key}' not found in the actual JSON at '{_format_path(node)}'")
+            for key, check in properties:
+                if key in value:
+                    check(value[key], (node, key, False), errors)
+            if check_additional is not None:
+                for key in value:
+                    if key not in known:
+                        if additional is False:
+                            errors.append(f"Unexpected key '{key}' at '{_format_path(node)}'")
+                        else:
+                            check_additional(value[key], (node, key, False), errors)
+        checks.append(check_object)
+
+    if "items" in schema or "minItems" in schema or "maxItems" in schema:
+        check_item = _compile(schema["items"], root) if "items" in schema else None
+        min_items = schema.get("minItems")
+        max_items = schema.get("maxItems")
+
+        def check_array(value, node, errors):
+            if not isinstance(value, list):
+                return
+            if min_items is not None and len(value) < min_items:
+                errors.append(f"Expected at least {min_items} items at '{_format_path(node)}', but got {len(value)}")
+            if max_items is not None and len(value) > max_items:
+                errors.append(f"Expected at most {max_items} items at '{_format_path(node)}', but got {len(value)}")
+            if check_item is not None:
+                for index, item in enumerate(value):
+                    check_item(item, (node, index, True), errors)
+        checks.append(check_array)
+
+    bounds = [
+        (keyword, schema[keyword], operator, description)
+        for keyword, operator, description in (
+            ("minimum", operator.lt, "at least"),
+            ("maximum", operator.gt, "at most"),
+            ("exclusiveMinimum", operator.le, "above"),
+            ("exclusiveMaximum", operator.ge, "below")
+        ) if keyword in schema
+    ]
+    if bounds:
+        def check_bounds(value, node, errors):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return
+            for keyword, bound, out_of_bounds, description in bounds:
+                # compared as is: Python compares ints and floats exactly (a large int does not fit in a float)
+                if out_of_bounds(value, bound):
+                    errors.append(f"Expected a value {description} {bound} at '{_format_path(node)}', but got {value}")
+        checks.append(check_bounds)
+
+    if "minLength" in schema or "maxLength" in schema or "pattern" in schema:
+        min_length = schema.get("minLength")
+        max_length = schema.get("maxLength")
+        pattern = re.compile(schema["pattern"]) if "pattern" in schema else None
+
+        def check_string(value, node, errors):
+            if not isinstance(value, str):
+                return
+            if min_length is not None and len(value) < min_length:
+                errors.append(f"Expected at least {min_length} characters at '{_format_path(node)}', got {len(value)}")
+            if max_length is not None and len(value) > max_length:
+                errors.append(f"Expected at most {max_length} characters at '{_format_path(node)}', got {len(value)}")
+            if pattern is not None and not pattern.search(value):
+                errors.append(f"Value at '{_format_path(node)}' does not match '{pattern.pattern}': {value!r}")
+        checks.append(check_string)
+
+    for keyword in ("allOf", "anyOf", "oneOf"):
+        if keyword in schema:
+            checks.append(_combine(keyword, [_compile(subschema, root) for subschema in schema[keyword]]))
+
+    if "not" in schema:
+        negated = _compile(schema["not"], root)
+
+        def check_not(value, node, errors):
+            failures = []
+            negated(value, node, failures)
+            if not failures:
+                errors.append(f"Value at '{_format_path(node)}' must not match the schema, but got {value!r}")
+        checks.append(check_not)
+
+    if len(checks) == 1:
+        return checks[0]
+
+    def check_all(value, node, errors):
+        for check in checks:
+            check(value, node, errors)
+    return check_all
+
+
+def _combine(keyword, alternatives):
+    # type: (str, List[Validator]) -> Validator
+    if keyword == "allOf":
+        def check_all_of(value, node, errors):
+            for alternative in alternatives:
+                alternative(value, node, errors)
+        return check_all_of
+
+    def check_one_or_any_of(value, node, errors):
+        matches = 0
+        for alternative in alternatives:
+            failures = []
+            alternative(value, node, failures)
+            if not failures:
+                matches += 1
+                if keyword == "anyOf":
+                    return
+        if keyword == "anyOf" or matches != 1:
+            errors.append(
+                f"Expected {'exactly one' if keyword == 'oneOf' else 'at least one'} of the {keyword} schemas "
+                f"to match at '{_format_path(node)}', but {matches} matched"
+            )
+    return check_one_or_any_of
+
+
+def compile_schema(schema):
+    # type: (Dict[str, Any] | bool) -> Validator
+    """Compiles a JSON Schema document into a validator."""
+    return _compile(schema, schema if isinstance(schema, dict) else {})
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_file(path, modified):
+    # type: (str, int) -> Validator
+    with open(path, "r", encoding="utf-8") as schema_file:
+        return compile_schema(json.load(schema_file))
+
+
+def compile_file(filename):
+    # type: (str) -> Validator
+    """Compiles (once, as long as it is unchanged) a JSON Schema file, looked up in SCHEMA_DIR first."""
+    path = os.path.join(_schema_dir, filename)
+    if not os.path.exists(path):
+        path = filename
+    path = os.path.abspath(path)
+    return _compile_file(path, os.stat(path).st_mtime_ns)
+
+
+def _table_type(spec):
+    # type: (str) -> Dict[str, Any]
+    alternatives = [alternative.strip() for alternative in spec.split("|")]
+    unknown = [alternative for alternative in alternatives if alternative not in _TABLE_TYPES]
+    if unknown:
+        raise ValueError(f"Unsupported schema type(s): {', '.join(unknown)} (expected {', '.join(_TABLE_TYPES)})")
+    if "any" in alternatives:
+        return {}
+    return {"type": [_TABLE_TYPES[alternative]["type"] for alternative in alternatives]}
+
+
+@functools.lru_cache(maxsize=None)
+def compile_table(rows):
+    # type: (Tuple[Tuple[str, str], ...]) -> Validator
+    """Compiles (once) a dot-key table schema, given as (dot key, type) rows, into a validator."""
+    root = {"type": "object", "properties": {}, "required": []}
+    for key, spec in rows:
+        optional = spec.endswith("?")
+        leaf = _table_type(spec[:-1] if optional else spec)
+        node = root
+        segments = key.split(".")
+        for position, segment in enumerate(segments):
+            is_list = segment.endswith("[]")
+            name = segment[:-2] if is_list else segment
+            last = position == len(segments) - 1
+            node.setdefault("type", "object")
+            properties = node.setdefault("properties", {})
+            if not (last and optional) and name not in node.setdefault("required", []):
+                node["required"].append(name)
+            if is_list:
+                child = properties.setdefault(name, {"type": "array", "items": {}})
+                if last:
+                    child["items"].update(leaf)
+                node = child["items"]
+            elif last:
+                properties.setdefault(name, {}).update(leaf)
+            else:
+                node = properties.setdefault(name, {})
+    return compile_schema(root)
+
+
+def validate(validator, document, path="root"):
+    # type: (Validator, Any, str) -> None
+    """
+    Runs a compiled validator against a document.
+
+    Raises:
+        AssertionError: listing every mismatch, if the document does not match.
+    """
+    errors = []  # type: List[str]
+    validator(document, path, errors)
+    if len(errors) == 1:
+        raise AssertionError(errors[0])
+    if errors:
+        raise AssertionError(f"{len(errors)} mismatches:\n" + "\n".join(f"  - {message}" for message in errors))
+
+
+def test_schema():
+    # type: () -> None
+    integer = compile_schema({"type": "integer"})
+    for value, valid in ((1, True), (1.0, True), (1.5, False), (True, False), ("1", False)):
+        errors = []  # type: List[str]
+        integer(value, "root", errors)
+        assert (not errors) == valid, f"Failed to check the integer type of {value!r}"
+    enum = compile_schema({"enum": [1, [0], {"a": False}]})
+    for value, valid in (
+        (1, True), (1.0, True), (True, False), ([False], False), ({"a": 0}, False), ({"a": False}, True)
+    ):
+        errors = []
+        enum(value, "root", errors)
+        assert (not errors) == valid, f"Failed to check the enum value {value!r}"
+    table = compile_table((("data.name", "str|null"), ("data.id", "int")))
+    errors = []
+    table({"data": {"name": None, "id": 2.0}}, "root", errors)
+    assert not errors, f"Failed to validate against a table: {errors}"
+    bounded = compile_schema({"minimum": 0, "exclusiveMaximum": 10 ** 400})
+    for value, valid in ((0, True), (0.5, True), (-1, False), (10 ** 400 - 1, True), (10 ** 400, False)):
+        errors = []
+        bounded(value, "root", errors)
+        assert (not errors) == valid, f"Failed to check the bounds of {value!r}"
+    try:
+        compile_schema({"type": "str"})
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Failed to reject an unknown type")
+    print("All tests passed!")
+
+
+if __name__ == '__main__':
+    test_schema()
@@ -0,0 +1,319 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+"""
+Streaming validation of large JSON responses.
+
+Reads a response (requested with `stream=True`) chunk by chunk and only
+decodes the values at the paths of the expected document: every other
+subtree is scanned past and thrown away as it arrives, so the peak memory
+depends on the expected paths and the chunk size, not on the payload size.
+
+The selected document has the same structure as the actual one along the
+expected paths, so it can be checked with `validators.partial_dict_compare`
+or compared with the expected document:
+    - keys which are not expected are left out (or kept with a `SKIPPED`
+      placeholder value, if `strict`),
+    - list items past the expected ones are kept as `SKIPPED` placeholders,
+      so the length of the lists is preserved,
+    - a container found where another type is expected is replaced by an
+      empty one of the same type.
+"""
+
+import codecs
+import json
+import re
+from typing import Any, Iterable
+from . import codec
+
+
+__all__ = [
+    'SKIPPED',
+    'select'
+]
+
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_DECODER = json.JSONDecoder()
+_CAPTURE = None
+_INCOMPLETE = object()
+
+
+class _Skipped(object):
+    """Placeholder of a value which has not been read."""
+
+    def __repr__(self):
+        return "..."
+
+
+SKIPPED = _Skipped()
+
+
+class _Reader(object):
+    """Pull reader of a JSON document, over an iterable of byte chunks."""
+
+    def __init__(self, chunks):
+        # type: (Iterable[bytes]) -> None
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._capture = None
+        self._eof = False
+
+    def _fill(self):
+        # type: () -> bool
+        """Reads the next chunk, dropping the text consumed (and not being captured)."""
+        if self._eof:
+            return False
+        keep = min(self._pos if self._capture is None else self._capture, len(self._buffer))
+        if keep:
+            self._buffer = self._buffer[keep:]
+            self._pos -= keep
+            if self._capture is not None:
+                self._capture -= keep
+        for chunk in self._chunks:
+            text = self._decoder.decode(chunk)
+            if text:
+                self._buffer += text
+                return True
+        self._buffer += self._decoder.decode(b"", final=True)
+        self._eof = True
+        return True
+
+    def _error(self, message):
+        # type: (str) -> ValueError
+        return ValueError(f"{message} in the JSON document: {self._buffer[self._pos:self._pos + 40]!r}")
+
+    def _search(self, pattern):
+        while True:
+            match = pattern.search(self._buffer, self._pos)
+            if match is not None:
+                return match
+            # the pattern only matches single characters: nothing left to scan before the next chunk
+            self._pos = len(self._buffer)
+            if not self._fill():
+                return None
+
+    def _decode(self):
+        # type: () -> Any
+        """Decodes the next value if it is complete in the buffer, else returns _INCOMPLETE."""
+        try:
+            value, end = _DECODER.raw_decode(self._buffer, self._pos)
+        except ValueError:
+            return _INCOMPLETE
+        # a number cut by the end of the buffer (e.g. '12' of '123', '1.' or '1e') goes on in the next chunk
+        if not self._eof and (end == len(self._buffer) or self._buffer[end] in '.eE+-'):
+            return _INCOMPLETE
+        self._pos = end
+        return value
+
+    def peek(self):
+        # type: () -> str
+        """Returns the next non-whitespace character, without consuming it."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise self._error("Unexpected end")
+
+    def expect(self, char):
+        # type: (str) -> None
+        if self.peek() != char:
+            raise self._error(f"Expected {char!r}")
+        self._pos += 1
+
+    def _skip_string(self):
+        # the opening quote is consumed
+        while True:
+            match = self._search(_STRING_SPECIAL)
+            if match is None:
+                raise self._error("Unterminated string")
+            self._pos = match.end()
+            if match.group() == '"':
+                return
+            # skip the escaped character
+            self._pos += 1
+            while self._pos > len(self._buffer):
+                if not self._fill():
+                    raise self._error("Unterminated string")
+
+    def skip_value(self):
+        # type: () -> None
+        """
+        Skips the next value: values complete in the buffer are decoded (and
+        dropped) at once, containers cut by the end of the buffer are walked
+        through item by item.
+        """
+        char = self.peek()
+        if self._decode() is not _INCOMPLETE:
+            return
+        if char == '"':
+            self._pos += 1
+            self._skip_string()
+        elif char in '[{':
+            close = ']' if char == '[' else '}'
+            self._pos += 1
+            if self.peek() == close:
+                self._pos += 1
+                return
+            while True:
+                if char == '{':
+                    self.skip_value()
+                    self.expect(':')
+                self.skip_value()
+                if self.peek() == close:
+                    self._pos += 1
+                    return
+                self.expect(',')
+        elif self._fill():
+            # a scalar cut by the end of the buffer
+            self.skip_value()
+        else:
+            raise self._error("Invalid value")
+
+    def read_value(self):
+        # type: () -> Any
+        """Reads and decodes the next value."""
+        self.peek()
+        value = self._decode()
+        if value is not _INCOMPLETE:
+            return value
+        self._capture = self._pos
+        try:
+            self.skip_value()
+            text = self._buffer[self._capture:self._pos]
+        finally:
+            self._capture = None
+        try:
+            return codec.loads(text)
+        except ValueError:
+            raise self._error("Invalid value") from None
+
+
+def _selector(expected, strict, unordered_lists):
+    # the expected paths: a dict/list of sub-selectors, or _CAPTURE to read the whole value
+    if isinstance(expected, dict):
+        return {key: _selector(value, strict, unordered_lists) for key, value in expected.items()}
+    if isinstance(expected, list) and not unordered_lists:
+        return [_selector(value, strict, unordered_lists) for value in expected]
+    return _CAPTURE
+
+
+def _select(reader, selector, strict):
+    # type: (_Reader, Any, bool) -> Any
+    if selector is _CAPTURE:
+        return reader.read_value()
+    char = reader.peek()
+    if char != ('{' if isinstance(selector, dict) else '['):
+        if char in '[{':
+            reader.skip_value()
+            return {} if char == '{' else []
+        return reader.read_value()
+    reader.expect(char)
+    if isinstance(selector, dict):
+        selected = {}
+        if reader.peek() == '}':
+            reader.expect('}')
+            return selected
+        while True:
+            if reader.peek() != '"':
+                raise reader._error("Expected a key")
+            key = reader.read_value()
+            reader.expect(':')
+            if key in selector:
+                selected[key] = _select(reader, selector[key], strict)
+            else:
+                reader.skip_value()
+                if strict:
+                    selected[key] = SKIPPED
+            if reader.peek() == '}':
+                reader.expect('}')
+                return selected
+            reader.expect(',')
+    selected = []
+    if reader.peek() == ']':
+        reader.expect(']')
+        return selected
+    while True:
+        if len(selected) < len(selector):
+            selected.append(_select(reader, selector[len(selected)], strict))
+        else:
+            reader.skip_value()
+            selected.append(SKIPPED)
+        if reader.peek() == ']':
+            reader.expect(']')
+            return selected
+        reader.expect(',')
+
+
+def select(response, expected, strict=False, unordered_lists=False, chunk_size=65536):
+    # type: (Any, Any, bool, bool, int) -> Any
+    """
+    Reads the parts of a streamed response at the paths of the expected document.
+
+    Args:
+        response: The response, requested with `stream=True`.
+        expected: The expected JSON structure.
+        strict: Keep unexpected keys (with a `SKIPPED` value), for an exact comparison.
+        unordered_lists: Read the expected lists whole, to match their items in any order.
+        chunk_size: The number of bytes read at once.
+    """
+    if hasattr(response, "iter_content"):
+        chunks = response.iter_content(chunk_size)
+    else:
+        chunks = [response.content]
+    try:
+        return _select(_Reader(chunks), _selector(expected, strict, unordered_lists), strict)
+    finally:
+        if hasattr(response, "close"):
+            response.close()
+
+
+def test_streaming_select():
+    class Response(object):
+        def __init__(self, document, size):
+            self.content = json.dumps(document).encode("utf-8")
+            self.size = size
+
+        def iter_content(self, chunk_size):
+            for start in range(0, len(self.content), self.size):
+                yield self.content[start:start + self.size]
+
+    document = {
+        'data': [{'id': i, 'name': f"n\"{i}", 'tags': ['a', 'b'], 'score': i * 1.5e-3} for i in range(100)],
+        'total': 100,
+        'meta': {'next': None, 'unicode': 'é😀'}
+    }
+    expected = {'data': [{'id': 0, 'tags': ['a', 'b']}], 'meta': {'unicode': 'é😀'}}
+    # chunks of one and a few bytes cut every token
+    for size in (1, 3, 7, 65536):
+        selected = select(Response(document, size), expected)
+        assert selected['data'][0] == {'id': 0, 'tags': ['a', 'b']}, "Failed to select the expected paths"
+        assert len(selected['data']) == 100 and selected['data'][1] is SKIPPED, "Failed to keep the list length"
+        assert selected['meta'] == {'unicode': 'é😀'}, "Failed to drop the unexpected keys"
+        assert select(Response(document, size), document, strict=True) == document, "Failed to select everything"
+        assert select(Response(document, size), {'total': 100}, strict=True) == \
+            {'data': SKIPPED, 'total': 100, 'meta': SKIPPED}, "Failed to keep the unexpected keys"
+
+    print("All tests passed!")
+
+
+if __name__ == '__main__':
+    test_streaming_select()
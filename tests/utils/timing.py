@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+"""
+Timing instrumentation.
+
+Records the duration of features, scenarios and steps (from the hooks in
+`tests/environment.py`), of every request made by `calls._make_request`
+(DNS, connect, time to first byte and total, and the response size on the
+wire and decoded, unless streamed), and of the table parsing and
+response comparison helpers. Every record carries the feature, scenario and
+step it happened in.
+
+Instrumentation is disabled unless the TIMINGS_FILE environment variable is
+set; the records are then appended to that file as JSON lines by `flush`.
+
+Example record:
+    {"kind": "request", "name": "GET http://localhost:5000/v1/simple-get",
+     "duration": 0.0021, "dns": 0.0003, "connect": 0.0004, "ttfb": 0.0019,
+     "status": 200, "wire_bytes": 40, "bytes": 40, "feature": "GET", "scenario": "GET simple-get (200 OK)",
+     "step": "a \\"GET\\" request is made"}
+"""
+
+import contextlib
+import functools
+import heapq
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List
+from . import compression
+
+
+__all__ = [
+    'enabled',
+    'set_current',
+    'bind',
+    'record',
+    'record_connection',
+    'measure',
+    'percentile',
+    'timed_request',
+    'flush',
+    'slowest_steps_table'
+]
+
+
+_timings_file = os.getenv("TIMINGS_FILE")
+_slowest_steps = int(os.getenv("TIMINGS_SLOWEST_STEPS", "10"))
+
+_records = []  # type: List[Dict[str, Any]]
+_steps = []  # type: List[Dict[str, Any]]
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def enabled():
+    # type: () -> bool
+    return _timings_file is not None
+
+
+def _current():
+    # type: () -> Dict[str, str]
+    if not hasattr(_local, "current"):
+        _local.current = {"feature": None, "scenario": None, "step": None}
+    return _local.current
+
+
+def set_current(**names):
+    # type: (str) -> None
+    """Sets the feature, scenario and/or step the next records belong to."""
+    _current().update(names)
+
+
+def bind(function):
+    # type: (Callable) -> Callable
+    """
+    Returns the function, recording under the feature, scenario and step of
+    the caller when run by another thread (e.g. of a `ThreadPoolExecutor`).
+    """
+    names = dict(_current())
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        set_current(**names)
+        return function(*args, **kwargs)
+    return wrapper
+
+
+def record(kind, name, duration, **fields):
+    # type: (str, str, float, Any) -> None
+    """Records a timing (in seconds) if the instrumentation is enabled."""
+    if _timings_file is None:
+        return
+    entry = {"kind": kind, "name": name, "duration": duration}
+    entry.update(fields)
+    entry.update(_current())
+    with _lock:
+        _records.append(entry)
+
+
+def record_connection(phase, duration):
+    # type: (str, float) -> None
+    """Records a phase ('dns' or 'connect') of the connection opened for the current request."""
+    connection = getattr(_local, "connection", None)
+    if connection is not None:
+        connection[phase] = connection.get(phase, 0.0) + duration
+
+
+@contextlib.contextmanager
+def measure(kind, name=None):
+    # type: (str, str) -> None
+    """Records the time spent in the `with` block."""
+    if _timings_file is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(kind, name or kind, time.perf_counter() - start)
+
+
+def percentile(samples, percent):
+    # type: (List[float], float) -> float
+    """Nearest-rank percentile of the (sorted) samples."""
+    if not samples:
+        return 0.0
+    rank = max(math.ceil(percent * len(samples) / 100.0), 1)
+    return samples[min(rank, len(samples)) - 1]
+
+
+def timed_request(function):
+    # type: (Callable) -> Callable
+    """Decorates `calls._make_request(session, method, url, ...)` to record the timings of every request."""
+    @functools.wraps(function)
+    def wrapper(session, method, url, *args, **kwargs):
+        if _timings_file is None:
+            return function(session, method, url, *args, **kwargs)
+        _local.connection = connection = {}
+        start = time.perf_counter()
+        try:
+            response = function(session, method, url, *args, **kwargs)
+        finally:
+            _local.connection = None
+        dns = connection.get("dns", 0.0)
+        # the body of a streamed response is not read yet (stream is the 3rd argument after the URL)
+        stream = kwargs["stream"] if "stream" in kwargs else len(args) > 2 and args[2]
+        wire_bytes, size = compression.sizes(response) if not stream else (None, None)
+        record(
+            "request", f"{method} {url}", time.perf_counter() - start,
+            dns=dns,
+            connect=max(connection.get("connect", 0.0) - dns, 0.0),
+            ttfb=response.elapsed.total_seconds(),
+            reused=not connection,
+            status=response.status_code,
+            wire_bytes=wire_bytes,
+            bytes=size
+        )
+        return response
+    return wrapper
+
+
+def flush():
+    # type: () -> None
+    """Appends the pending records to TIMINGS_FILE, keeping the slowest steps for the summary."""
+    global _steps
+    if _timings_file is None:
+        return
+    with _lock:
+        entries = list(_records)
+        _records.clear()
+    _steps = heapq.nlargest(
+        _slowest_steps,
+        _steps + [entry for entry in entries if entry["kind"] == "step"],
+        key=lambda entry: entry["duration"]
+    )
+    if entries:
+        with open(_timings_file, "a") as stream:
+            stream.write("".join(json.dumps(entry) + "\n" for entry in entries))
+
+
+def slowest_steps_table():
+    # type: () -> str
+    """Formats the slowest steps recorded so far (see `flush`) as a table."""
+    header = f"{'duration ms':>12}  {'scenario':<40}  step"
+    lines = [header, "-" * len(header)]
+    for entry in _steps:
+        lines.append(f"{entry['duration'] * 1000:>12.1f}  {str(entry['scenario'])[:40]:<40}  {entry['name']}")
+    return "\n".join(lines)
+
+
+def test_percentile():
+    # type: () -> None
+    assert percentile(list(range(1, 31)), 95) == 29, "Failed to rank the p95 of 30 samples"
+    assert percentile([1, 2, 3, 4, 5], 50) == 3, "Failed to rank the p50 of 5 samples"
+    assert percentile(list(range(1, 101)), 99) == 99, "Failed to rank the p99 of 100 samples"
+    assert percentile([7], 1) == 7, "Failed to rank a single sample"
+    assert percentile([1, 2], 100) == 2, "Failed to rank the p100"
+    assert percentile([], 95) == 0.0, "Failed to rank no samples"
+    print("All tests passed!")
+
+
+if __name__ == '__main__':
+    test_percentile()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+"""
+Pooled, keep-alive HTTP transport.
+
+One `requests.Session` is kept per worker process and host, so every step
+talking to the same host reuses the already open TCP (and TLS) connections
+instead of opening a new one per request.
+
+Configuration (environment variables):
+    - HTTP_POOL_CONNECTIONS: number of per-host pools cached by a session.
+    - HTTP_POOL_MAXSIZE: maximum number of connections kept per host.
+    - HTTP_POOL_BLOCK: if 'true', never open more than HTTP_POOL_MAXSIZE
+      connections per host and wait for a free one instead.
+"""
+
+import os
+import socket
+import threading
+import time
+from typing import Dict
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family, create_connection
+from . import timing
+
+
+__all__ = [
+    'setup',
+    'settings',
+    'session',
+    'stats',
+    'teardown'
+]
+
+
+_pool_connections = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))
+_pool_maxsize = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+_pool_block = os.getenv("HTTP_POOL_BLOCK", "false").lower() == "true"
+
+_sessions = {}  # type: Dict[str, requests.Session]
+_sessions_lock = threading.Lock()
+_owner_pid = os.getpid()
+# counted by the adapter and the connections themselves (not read from the urllib3 pools, which may be evicted)
+_counts = {"requests": 0, "new_connections": 0, "reused_connections": 0}
+_counts_lock = threading.Lock()
+# the connects of the current thread, to tell whether a request opened a connection
+_local = threading.local()
+
+
+def _count(name):
+    # type: (str) -> None
+    with _counts_lock:
+        _counts[name] += 1
+
+
+def _reset_counts():
+    # type: () -> None
+    with _counts_lock:
+        for name in _counts:
+            _counts[name] = 0
+
+
+class _TimedConnectionMixin(object):
+    """Counts the connects, and reports their DNS and connect (TCP, plus TLS for https) time to `timing`."""
+
+    def _new_conn(self):
+        if not timing.enabled():
+            return super(_TimedConnectionMixin, self)._new_conn()
+        # the name is resolved once, timed, and the resolved addresses connected to in turn (as urllib3 does)
+        start = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(self._dns_host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror as error:
+            raise NewConnectionError(self, f"Failed to establish a new connection: {error}")
+        finally:
+            timing.record_connection("dns", time.perf_counter() - start)
+        options = {"source_address": self.source_address, "socket_options": self.socket_options}
+        error = None  # type: OSError | None
+        for _, _, _, _, address in addresses:
+            try:
+                return create_connection(address[:2], self.timeout, **options)
+            except OSError as connect_error:
+                error = connect_error
+        if isinstance(error, socket.timeout):
+            raise ConnectTimeoutError(self, f"Connection to {self.host} timed out. (connect timeout={self.timeout})")
+        raise NewConnectionError(self, f"Failed to establish a new connection: {error}")
+
+    def connect(self):
+        start = time.perf_counter()
+        super(_TimedConnectionMixin, self).connect()
+        timing.record_connection("connect", time.perf_counter() - start)
+        _count("new_connections")
+        _local.connects = getattr(_local, "connects", 0) + 1
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = type("TimedHTTPConnection", (_TimedConnectionMixin, HTTPConnection), {})
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = type("TimedHTTPSConnection", (_TimedConnectionMixin, HTTPSConnection), {})
+
+
+class _PooledAdapter(HTTPAdapter):
+    """Uses the timed connection pools, and counts the requests (and those sent over an open connection)."""
+
+    def send(self, request, **kwargs):
+        connects = getattr(_local, "connects", 0)
+        _count("requests")
+        response = super(_PooledAdapter, self).send(request, **kwargs)
+        # a failed request (e.g. a refused connection) was not sent over an open connection either
+        if getattr(_local, "connects", 0) == connects:
+            _count("reused_connections")
+        return response
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(_PooledAdapter, self).init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool
+        }
+
+
+def _check_owner():
+    # type: () -> None
+    # sessions (and their sockets) must not be shared with a forked worker
+    global _owner_pid
+    if _owner_pid != os.getpid():
+        _sessions.clear()
+        _owner_pid = os.getpid()
+        _reset_counts()
+
+
+def _new_session():
+    # type: () -> requests.Session
+    adapter = _PooledAdapter(
+        pool_connections=_pool_connections,
+        pool_maxsize=_pool_maxsize,
+        pool_block=_pool_block
+    )
+    new_session = requests.Session()
+    new_session.mount("http://", adapter)
+    new_session.mount("https://", adapter)
+    return new_session
+
+
+def setup(pool_connections=None, pool_maxsize=None, pool_block=None):
+    # type: (int, int, bool) -> None
+    """Configures the transport of the current worker process, closing any open sessions."""
+    global _pool_connections, _pool_maxsize, _pool_block
+    teardown()
+    _reset_counts()
+    if pool_connections is not None:
+        _pool_connections = pool_connections
+    if pool_maxsize is not None:
+        _pool_maxsize = pool_maxsize
+    if pool_block is not None:
+        _pool_block = pool_block
+
+
+def settings():
+    # type: () -> Dict[str, int | bool]
+    """Returns the pool settings of the current worker process, as `setup` arguments."""
+    return {"pool_connections": _pool_connections, "pool_maxsize": _pool_maxsize, "pool_block": _pool_block}
+
+
+def session(host):
+    # type: (str) -> requests.Session
+    """Returns the pooled session of the given host, creating it on first use."""
+    _check_owner()
+    host_session = _sessions.get(host)
+    if host_session is None:
+        # the first calls may race (e.g. the threads of `calls.make_all`): a single session is created
+        with _sessions_lock:
+            host_session = _sessions.get(host)
+            if host_session is None:
+                host_session = _sessions[host] = _new_session()
+    return host_session
+
+
+def stats():
+    # type: () -> Dict[str, int]
+    """
+    Returns the connection reuse statistics of the current worker process:
+    the requests sent, the connections opened, and the requests sent over
+    an already open connection.
+    """
+    _check_owner()
+    with _counts_lock:
+        return dict(_counts, hosts=len(_sessions))
+
+
+def teardown():
+    # type: () -> None
+    """Closes every session (and pooled connection) of the current worker process."""
+    _check_owner()
+    with _sessions_lock:
+        closed = list(_sessions.values())
+        _sessions.clear()
+    for host_session in closed:
+        host_session.close()
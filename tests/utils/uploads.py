@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# /*************************************************************************
+# * Copyright 2025 Karthick Jaganathan
+# *
+# * Licensed under the Apache License, Version 2.0 (the "License");
+# * you may not use this file except in compliance with the License.
+# * You may obtain a copy of the License at
+# *
+# * https://www.apache.org/licenses/LICENSE-2.0
+# *
+# * Unless required by applicable law or agreed to in writing, software
+# * distributed under the License is distributed on an "AS IS" BASIS,
+# * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# * See the License for the specific language governing permissions and
+# * limitations under the License.
+# **************************************************************************/
+
+"""
+Streamed request bodies.
+
+The bodies are iterables of byte chunks without a length, so `requests`
+sends them with chunked transfer encoding, one chunk at a time: the payload
+is never built in memory. Each iteration starts over, so a call can be sent
+again (retried, or repeated by the latency steps).
+"""
+
+import json
+import os
+import re
+from typing import Any, Dict, Iterator
+
+
+__all__ = [
+    'FileBody',
+    'JsonArrayBody'
+]
+
+
+_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(64 * 1024)))
+# the item index placeholder: a whole value ("<index>", replaced by a number) or a part of a text
+_INDEX_PATTERN = re.compile(r'"<index>"|<index>')
+
+
+class FileBody(object):
+    """The content of a file, read in chunks."""
+
+    def __init__(self, path, chunk_size=_CHUNK_SIZE):
+        # type: (str, int) -> None
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Request body file not found: {path!r}")
+        self.path = path
+        self.chunk_size = chunk_size
+
+    def __iter__(self):
+        # type: () -> Iterator[bytes]
+        with open(self.path, "rb") as body_file:
+            for chunk in iter(lambda: body_file.read(self.chunk_size), b""):
+                yield chunk
+
+    def __repr__(self):
+        # type: () -> str
+        stat = os.stat(self.path)
+        return f"FileBody({self.path!r}, size={stat.st_size}, mtime_ns={stat.st_mtime_ns})"
+
+
+class JsonArrayBody(object):
+    """
+    A JSON array of `count` items generated from a template, `<index>` in
+    the template being replaced by the index of the item (a number if it is
+    a whole value, e.g. {"id": "<index>", "name": "item-<index>"}).
+    """
+
+    def __init__(self, template, count, chunk_size=_CHUNK_SIZE):
+        # type: (Dict[str, Any], int, int) -> None
+        self.template = template
+        self.count = count
+        self.chunk_size = chunk_size
+        # the template is serialized once, and split around the placeholders
+        self._pieces = _INDEX_PATTERN.split(json.dumps(template))
+
+    def __iter__(self):
+        # type: () -> Iterator[bytes]
+        chunk = ["["]
+        size = 1
+        for index in range(self.count):
+            item = str(index).join(self._pieces)
+            if index:
+                chunk.append(",")
+            chunk.append(item)
+            size += len(item) + 1
+            if size >= self.chunk_size:
+                yield "".join(chunk).encode("utf-8")
+                chunk, size = [], 0
+        chunk.append("]")
+        yield "".join(chunk).encode("utf-8")
+
+    def __repr__(self):
+        # type: () -> str
+        return f"JsonArrayBody({json.dumps(self.template, sort_keys=True)}, count={self.count})"
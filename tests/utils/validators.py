@@ -15,36 +15,226 @@
 # * limitations under the License.
 # **************************************************************************/
 
+import os
+from collections import defaultdict
+from typing import Any, List
+
 
 __all__ = "partial_dict_compare"
 
 
-def partial_dict_compare(expected, actual, path="root"):
+_collect_all = os.getenv("COMPARE_COLLECT_ALL", "false").lower() == "true"
+
+_MISSING = object()
+
+
+def _format_path(node):
+    # a path node is either the root path or a (parent node, key, is_index) tuple
+    parts = []
+    while isinstance(node, tuple):
+        node, key, is_index = node
+        parts.append(f"[{key}]" if is_index else f".{key}")
+    return node + "".join(reversed(parts))
+
+
+def _shape(value):
+    if isinstance(value, dict):
+        return frozenset((key, _shape(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(_shape(item) for item in value)
+    return None
+
+
+def _project(expected, actual):
+    # the part of `actual` compared against `expected`
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        return {key: _project(item, actual[key]) if key in actual else _MISSING for key, item in expected.items()}
+    if isinstance(expected, list) and isinstance(actual, list) and len(expected) == len(actual):
+        return [_project(exp_item, act_item) for exp_item, act_item in zip(expected, actual)]
+    return actual
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return "dict", frozenset((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return "list", tuple(_freeze(item) for item in value)
+    return value
+
+
+def _unmatched_items(expected, actual):
+    # type: (List[Any], List[Any]) -> List[int]
+    """
+    Matches every expected item with a distinct actual item, regardless of
+    their order, and returns the indexes of the expected items left without
+    a match. Items are matched by hashing the actual items projected on the
+    fields of the expected ones; the (few) items left after that are compared
+    pairwise, to match nested lists in any order as well.
+    """
+    used = [False] * len(actual)
+    leftovers = []
+    shapes = defaultdict(list)
+    for index, item in enumerate(expected):
+        shapes[_shape(item)].append(index)
+    for indexes in shapes.values():
+        template = expected[indexes[0]]
+        candidates = defaultdict(list)
+        for index, item in enumerate(actual):
+            if not used[index]:
+                try:
+                    candidates[_freeze(_project(template, item))].append(index)
+                except TypeError:
+                    pass
+        for index in indexes:
+            try:
+                matches = candidates.get(_freeze(expected[index]), [])
+            except TypeError:
+                matches = []
+            while matches and used[matches[-1]]:
+                matches.pop()
+            if matches:
+                used[matches.pop()] = True
+            else:
+                leftovers.append(index)
+    unmatched = []
+    for index in leftovers:
+        for candidate, item in enumerate(actual):
+            if not used[candidate] and not _compare(expected[index], item, "", True, True):
+                used[candidate] = True
+                break
+        else:
+            unmatched.append(index)
+    return unmatched
+
+
+def _compare(expected, actual, path, first_only, unordered_lists):
+    # type: (Any, Any, str, bool, bool) -> List[str]
+    mismatches = []
+    # one frame per container being walked: (iterator of its children, path node, actual dict, is_list)
+    stack = []
+
+    def enter(expected, actual, node):
+        if isinstance(expected, dict):
+            if not isinstance(actual, dict):
+                mismatches.append(f"Expected a dictionary at '{_format_path(node)}', but got {type(actual)}")
+            else:
+                stack.append((iter(expected.items()), node, actual, False))
+        elif not isinstance(actual, list):
+            mismatches.append(f"Expected a list at '{_format_path(node)}', but got {type(actual)}")
+        elif len(expected) != len(actual):
+            mismatches.append(
+                f"List length mismatch at '{_format_path(node)}': expected {len(expected)}, got {len(actual)}"
+            )
+        elif unordered_lists:
+            unmatched = _unmatched_items(expected, actual)
+            if unmatched:
+                mismatches.append(f"No match for the expected item(s) {unmatched} in the list at '{_format_path(node)}'")
+        else:
+            stack.append((zip(range(len(expected)), expected, actual), node, None, True))
+
+    if isinstance(expected, (dict, list)):
+        enter(expected, actual, path)
+    elif expected != actual:
+        mismatches.append(f"Value mismatch at '{path}': expected '{expected}', but got '{actual}'")
+    missing = _MISSING
+    while stack and not (mismatches and first_only):
+        children, node, actual_dict, is_list = stack[-1]
+        for child in children:
+            if is_list:
+                key, expected, actual = child
+            else:
+                key, expected = child
+                actual = actual_dict.get(key, missing)
+                if actual is missing and key not in actual_dict:
+                    mismatches.append(f"Key '{key}' not found in the actual JSON at '{_format_path(node)}'")
+                    if first_only:
+                        break
+                    continue
+            expected_type = type(expected)
+            if expected_type is dict or expected_type is list or isinstance(expected, (dict, list)):
+                enter(expected, actual, (node, key, is_list))
+                break
+            if expected != actual:
+                mismatches.append(
+                    f"Value mismatch at '{_format_path((node, key, is_list))}': expected '{expected}', but got '{actual}'"
+                )
+                if first_only:
+                    break
+        else:
+            stack.pop()
+    return mismatches
+
+
+def partial_dict_compare(expected, actual, path="root", collect_all=None, unordered_lists=False):
     """
-    Recursively compare expected keys and values against the actual JSON object.
+    Compare expected keys and values against the actual JSON object.
+
+    The objects are walked with an explicit stack (deep documents do not hit
+    the recursion limit), and the key paths are only built for mismatches.
 
     Args:
         expected: The expected JSON structure.
         actual: The actual JSON structure.
-        path: The current key path for error tracking.
+        path: The key path of the compared objects, for error tracking.
+        collect_all: Report every mismatch in one assertion instead of the
+            first one (defaults to the COMPARE_COLLECT_ALL environment variable).
+        unordered_lists: Match list items regardless of their order.
 
     Raises:
         AssertionError: If the comparison fails.
     """
-    if isinstance(expected, dict):
-        assert isinstance(actual, dict), \
-            f"Expected a dictionary at '{path}', but got {type(actual)}"
-        for key, value in expected.items():
-            assert key in actual, \
-                f"Key '{key}' not found in the actual JSON at '{path}'"
-            partial_dict_compare(value, actual[key], f"{path}.{key}")
-    elif isinstance(expected, list):
-        assert isinstance(actual, list), \
-            f"Expected a list at '{path}', but got {type(actual)}"
-        assert len(expected) == len(actual), \
-            f"List length mismatch at '{path}': expected {len(expected)}, got {len(actual)}"
-        for index, (exp_item, act_item) in enumerate(zip(expected, actual)):
-            partial_dict_compare(exp_item, act_item, f"{path}[{index}]")
-    else:
-        assert expected == actual, \
-            f"Value mismatch at '{path}': expected '{expected}', but got '{actual}'"
+    if collect_all is None:
+        collect_all = _collect_all
+    mismatches = _compare(expected, actual, path, not collect_all, unordered_lists)
+    if len(mismatches) == 1:
+        raise AssertionError(mismatches[0])
+    if mismatches:
+        raise AssertionError(f"{len(mismatches)} mismatches:\n" + "\n".join(f"  - {message}" for message in mismatches))
+
+
+def _mismatches(expected, actual, **kwargs):
+    # type: (Any, Any, Any) -> str
+    try:
+        partial_dict_compare(expected, actual, **kwargs)
+    except AssertionError as error:
+        return str(error)
+    return ""
+
+
+def test_partial_dict_compare():
+    # type: () -> None
+    # unordered lists with duplicates: every expected item is matched with a distinct actual item
+    actual = {"items": [{"id": 1, "tags": ["a", "b"]}, {"id": 2, "tags": ["c"]}, {"id": 1, "tags": ["b", "a"]}]}
+    assert not _mismatches({"items": [{"id": 2}, {"id": 1}, {"id": 1}]}, actual, unordered_lists=True), \
+        "Failed to match the list items in any order"
+    assert not _mismatches(
+        {"items": [{"tags": ["b", "a"]}, {"tags": ["c"]}, {"tags": ["a", "b"]}]}, actual, unordered_lists=True
+    ), "Failed to match the nested list items in any order"
+    assert "No match for the expected item(s)" in _mismatches(
+        {"items": [{"id": 2}, {"id": 2}, {"id": 1}]}, actual, unordered_lists=True
+    ), "Failed to match a duplicated item only once"
+
+    # collect all: every mismatch is reported with its path, and only the first one otherwise
+    expected = {"a": 1, "b": {"c": 2, "d": [1, 2]}, "e": 3}
+    actual = {"a": 0, "b": {"c": 3, "d": [1, 5]}}
+    message = _mismatches(expected, actual, collect_all=True)
+    assert message.startswith("4 mismatches:"), f"Failed to collect every mismatch: {message}"
+    for path in ("'root.a'", "'root.b.c'", "'root.b.d[1]'", "Key 'e' not found"):
+        assert path in message, f"Failed to report the mismatch at {path}: {message}"
+    message = _mismatches(expected, actual, collect_all=False)
+    assert message == "Value mismatch at 'root.a': expected '1', but got '0'", \
+        f"Failed to report the first mismatch only: {message}"
+
+    # deep nesting: walked without recursion
+    expected, actual = {"leaf": 1}, {"leaf": 2}
+    for _ in range(10000):
+        expected, actual = {"child": [expected]}, {"child": [actual]}
+    message = _mismatches(expected, actual)
+    assert message.endswith(".child[0].leaf': expected '1', but got '2'"), \
+        f"Failed to compare a deeply nested document: {message[-100:]}"
+
+    print("All tests passed!")
+
+
+if __name__ == '__main__':
+    test_partial_dict_compare()